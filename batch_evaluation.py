@@ -0,0 +1,173 @@
+import numpy as np
+import chess
+from evaluation import PIECE_SQUARE_VALUES
+
+# Ordine dei 12 piani di bitboard: prima i pezzi bianchi, poi i neri, da pedone a re
+PLANES = [(color, piece_type) for color in (chess.WHITE, chess.BLACK) for piece_type in chess.PIECE_TYPES]
+
+# Tabella (12, 64) con i termini di `chess_H0` (materiale + centro) dal punto di vista del Bianco
+PIECE_SQUARE_TABLE = np.array([PIECE_SQUARE_VALUES[color][piece_type] for color, piece_type in PLANES],
+                              dtype=np.int64)
+# La stessa tabella appiattita in float64, per un prodotto matrice-vettore BLAS (i valori restano esatti)
+_FLAT_TABLE = PIECE_SQUARE_TABLE.reshape(-1).astype(np.float64)
+
+
+def encode_board(board: chess.BaseBoard):
+    """
+    Codifica una posizione come 13 interi: le 12 bitboard dei pezzi e il giocatore di turno.
+    """
+    black, white = board.occupied_co
+    pieces = (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+    return [mask & white for mask in pieces] + [mask & black for mask in pieces] + [int(board.turn)]
+
+
+def encode_boards(boards):
+    """
+    Codifica una lista di posizioni in un array (n, 13) di uint64 (vedi `encode_board`).
+    """
+    return np.array([encode_board(board) for board in boards], dtype=np.uint64).reshape(-1, 13)
+
+
+def _piece_types(board: chess.BaseBoard):
+    """
+    Lista di 64 elementi con il tipo di pezzo su ogni casa (0 se vuota).
+    """
+    types = [0] * 64
+    pieces = (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+    for piece_type, mask in enumerate(pieces, chess.PAWN):
+        for square in chess.scan_forward(mask):
+            types[square] = piece_type
+    return types
+
+
+def encode_children(board: chess.Board, moves):
+    """
+    Codifica in un array (n, 13) le posizioni raggiunte da `board` con ciascuna delle mosse
+    (pseudo-legali) senza giocarle: le bitboard del padre vengono copiate n volte e
+    aggiornate in blocco con NumPy.
+    """
+    color = board.turn
+    own = 0 if color == chess.WHITE else 6
+    enemy = 6 - own
+    n = len(moves)
+    # Per ogni mossa: pezzo mosso, pezzo posato (diverso in caso di promozione),
+    # pezzo catturato (-1 se nessuno) e, per l'arrocco, la torre da spostare
+    from_squares, to_squares, moved, placed = [], [], [], []
+    captures, capture_planes, capture_squares, castlings, rook_squares = [], [], [], [], []
+    types = _piece_types(board)
+    for i, move in enumerate(moves):
+        from_square, to_square = move.from_square, move.to_square
+        piece_type = types[from_square]
+        if piece_type == chess.KING and board.is_castling(move):
+            rank = chess.square_rank(from_square)
+            kingside = board.is_kingside_castling(move)
+            rook_from = to_square if board.chess960 else chess.square(7 if kingside else 0, rank)
+            to_square = chess.square(6 if kingside else 2, rank)
+            castlings.append(i)
+            rook_squares.append((1 << rook_from) ^ (1 << chess.square(5 if kingside else 3, rank)))
+        elif piece_type == chess.PAWN and to_square == board.ep_square:
+            captures.append(i)
+            capture_planes.append(enemy + chess.PAWN - 1)
+            capture_squares.append(to_square + (-8 if color == chess.WHITE else 8))
+        else:
+            captured = types[to_square]
+            if captured:
+                captures.append(i)
+                capture_planes.append(enemy + captured - 1)
+                capture_squares.append(to_square)
+        from_squares.append(from_square)
+        to_squares.append(to_square)
+        moved.append(own + piece_type - 1)
+        placed.append(own + (move.promotion or piece_type) - 1)
+
+    parent = np.array(encode_board(board), dtype=np.uint64)
+    children = np.tile(parent, (n, 1))
+    rows = np.arange(n)
+    one = np.uint64(1)
+    children[rows, moved] ^= one << np.array(from_squares, dtype=np.uint64)
+    if captures:
+        children[captures, capture_planes] &= ~(one << np.array(capture_squares, dtype=np.uint64))
+    if castlings:
+        children[castlings, own + chess.ROOK - 1] ^= np.array(rook_squares, dtype=np.uint64)
+    children[rows, placed] |= one << np.array(to_squares, dtype=np.uint64)
+    children[:, 12] = int(not color)
+    return children
+
+
+def checking_candidates(board: chess.Board, moves):
+    """
+    Indici delle mosse che possono dare scacco: quelle che attaccano il re avversario dalla casa
+    di arrivo, quelle che liberano la linea di un pezzo a lungo raggio verso il re (scacco di
+    scoperta), gli arrocchi e le prese en passant. L'insieme può contenere falsi positivi,
+    mai falsi negativi.
+    """
+    color = board.turn
+    king = board.king(not color)
+    if king is None:
+        return []
+    king_mask = chess.BB_SQUARES[king]
+    occupied = board.occupied
+    own = board.occupied_co[color]
+    rooks_and_queens = (board.rooks | board.queens) & own
+    bishops_and_queens = (board.bishops | board.queens) & own
+
+    # Case tra il re avversario e i nostri pezzi a lungo raggio allineati con esso
+    snipers = ((chess.BB_RANK_ATTACKS[king][0] & rooks_and_queens) |
+               (chess.BB_FILE_ATTACKS[king][0] & rooks_and_queens) |
+               (chess.BB_DIAG_ATTACKS[king][0] & bishops_and_queens))
+    discovery = 0
+    for sniper in chess.scan_reversed(snipers):
+        discovery |= chess.between(king, sniper)
+
+    candidates = []
+    types = _piece_types(board)
+    for i, move in enumerate(moves):
+        from_square, to_square = move.from_square, move.to_square
+        if discovery >> from_square & 1:
+            candidates.append(i)
+            continue
+        piece_type = move.promotion or types[from_square]
+        if piece_type == chess.PAWN:
+            attacks = chess.BB_PAWN_ATTACKS[color][to_square]
+            if to_square == board.ep_square:
+                candidates.append(i)
+                continue
+        elif piece_type == chess.KNIGHT:
+            attacks = chess.BB_KNIGHT_ATTACKS[to_square]
+        elif piece_type == chess.KING:
+            if board.is_castling(move):
+                candidates.append(i)
+            continue
+        else:
+            occupancy = (occupied & ~chess.BB_SQUARES[from_square]) | chess.BB_SQUARES[to_square]
+            attacks = 0
+            if piece_type != chess.ROOK:
+                attacks = chess.BB_DIAG_ATTACKS[to_square][chess.BB_DIAG_MASKS[to_square] & occupancy]
+            if piece_type != chess.BISHOP:
+                attacks |= (chess.BB_RANK_ATTACKS[to_square][chess.BB_RANK_MASKS[to_square] & occupancy] |
+                            chess.BB_FILE_ATTACKS[to_square][chess.BB_FILE_MASKS[to_square] & occupancy])
+        if attacks & king_mask:
+            candidates.append(i)
+    return candidates
+
+
+def bitboard_planes(encoded: np.ndarray):
+    """
+    Espande le bitboard di un array (n, 13) prodotto da `encode_boards` in piani (n, 12, 64) di 0/1.
+    """
+    bitboards = np.ascontiguousarray(encoded[:, :12], dtype='<u8')
+    return np.unpackbits(bitboards.view(np.uint8), axis=1, bitorder='little').reshape(-1, 12, 64)
+
+
+def chess_H0_batch(boards):
+    """
+    Versione vettoriale della parte statica di `chess_H0` (materiale e centro) per molte posizioni.
+
+    Accetta una lista di board oppure un array (n, 13) già codificato con `encode_boards`,
+    e restituisce un np.ndarray di n valori dal punto di vista del giocatore di turno.
+    Gli stati finali non vengono riconosciuti.
+    """
+    encoded = boards if isinstance(boards, np.ndarray) else encode_boards(boards)
+    planes = bitboard_planes(encoded)
+    white_scores = (planes.reshape(len(encoded), -1).astype(np.float64) @ _FLAT_TABLE).astype(np.int64)
+    return np.where(encoded[:, 12] == 1, white_scores, -white_scores)
@@ -0,0 +1,245 @@
+import argparse
+import csv
+import json
+import platform
+import random
+import time
+import chess
+from minmax_agent import (MinMaxAgent, Algorithms, chess_H0, get_chess_children, get_chess_moves,
+                          is_chess_final)
+from perft import PERFT_SUITE
+
+# Posizioni del benchmark: quelle di perft, alcune posizioni tipiche (aperture, matti, finali)
+# e posizioni di partite casuali con seme fisso, metà con il Bianco e metà con il Nero al tratto
+BENCHMARK_POSITIONS = tuple(fen for _, fen, _ in PERFT_SUITE) + (
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "rnbqkb1r/pp3ppp/4pn2/2pp4/2PP4/2N2N2/PP2PPPP/R1BQKB1R w KQkq - 0 5",
+    "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1",
+    "4k3/8/8/3q4/8/8/3R4/3QK3 w - - 0 1",
+    "8/8/4k3/8/2K5/8/3P4/8 w - - 0 1",
+    "8/8/8/8/8/8/6k1/4K2R w K - 0 1",
+    "rn1qkbnr/1b1ppppp/2p5/pp4N1/5PP1/8/PPPPP2P/RNBQKB1R b KQkq - 0 5",
+    "rn1qkbnr/1pp1pp1p/p2p4/6p1/7P/1PP5/P2PPP1P/RNBQKB1R b KQkq - 0 5",
+    "rn1qkbnr/pbpppppp/8/1p6/3P4/4P3/PPPQ1PPP/RNB1KBNR b kq - 3 5",
+    "r1bqkbnr/p1p2p2/n3p2p/1p1p2N1/8/1PP4P/PB1PPPP1/RN1QKB1R w KQkq - 0 7",
+    "r2qk2r/ppp1ppbp/2n1bB2/3p2p1/1P6/2P3P1/P2PPP1P/RN1QKBNR w KQkq - 1 7",
+    "rQbqk1nr/3ppp1p/p5p1/8/2P1P3/8/P2P1PPP/bNB1KBNR w Kkq - 0 7",
+    "rn1qkbnr/1pp1p1p1/p2pB3/5p2/3P2p1/8/PPP1PP1P/RNBQK2R w KQkq - 0 7",
+    "rn2kbnr/ppq1pppp/8/2pp4/P5b1/1P2PN2/R1PP1PPP/1NBQKB1R w Kkq - 3 7",
+    "r2qk1nr/ppp3p1/4b3/2bP3p/1n6/N3P2N/P2P1P1P/R1BQKB1R b KQkq - 0 9",
+    "r3kbnr/1p2ppp1/2n4p/p7/8/2P1P2B/PP3P1P/R1BQK2R b KQkq - 0 9",
+    "rn2kbn1/p3pppr/1qpp4/1N6/5P2/6P1/PPP1P2P/R3KBNR b KQq - 1 9",
+    "rnb1kb2/pp1qpp2/2pp1n1r/7p/8/4P1PP/PPPP1P1R/RNB1KBN1 b Qq - 5 9",
+    "1Bbq1bnr/1p2pkp1/7p/5p2/3P3P/1P3NP1/r2PPP2/RN1QKB1R w KQ - 0 11",
+    "1rbq1b1r/p1pkp1p1/3p3n/1N3pN1/1n4p1/P7/2PPPP1P/R1BQKB1R w KQ - 0 11",
+    "Qn2kbnr/2pp2pp/4P3/5pq1/p7/4B3/PPP1NPPP/R3KB1R w KQk - 1 11",
+    "r1b1k2r/pppn1p2/4pqp1/8/PBP2P1p/N6N/6PP/R3KB1R w KQkq - 2 11",
+    "r1bq1bn1/p1p1pkp1/2pp4/8/3P4/P3P3/1nK2PPr/RNB3NR w - - 0 11",
+    "r3kbnr/p2ppppp/1p6/6P1/3P4/8/PP3P1q/RNB1KbNR w KQkq - 0 11",
+    "rn1k1bnr/p3ppp1/8/7p/4p3/N6N/PPPK1PP1/R1B4R w - - 0 11",
+    "1r1k3r/p1p2p1p/5p2/8/4p3/P6B/2PBPP1P/RN2K1NR b KQ - 2 13",
+    "r1b3n1/ppp2qbp/2k1p3/P2p1pN1/1n6/1P3PP1/2PPP2P/RN1QKB1R b - - 0 13",
+    "r5nr/p5p1/2b1p1k1/1Q5p/4P3/1P3P2/P1P3PP/RNBK1BNR b - - 0 13",
+    "1nq3n1/r1p1pkbr/8/8/p2P1P2/1P2B3/3KP2P/R2Q4 w - - 0 17",
+    "3r2nr/3k2p1/1p6/p2p1PpP/3P3R/8/PP2PK2/RN1Q1B2 w - - 0 17",
+    "1nb1kb2/8/2pp1p2/1N1P4/5P2/2P5/4BKP1/3Q2N1 b - - 0 21",
+    "2b3nr/1p1p1k1p/2p5/4Pp2/2K4P/8/3q4/R7 b - - 1 21",
+    "2r2r2/1p3k1p/p4P2/2pn4/4P3/1P3N2/P1P2K2/R1B5 b - - 0 21",
+    "6n1/ppn2kb1/3p1p2/8/3P4/P5P1/4r1BK/RN4R1 b - - 3 21",
+    "rnb1k1nr/3p4/1pp4P/pN6/1q6/6P1/3PB2P/2B1K2R b Kkq - 0 21",
+    "rnb3k1/pp1Rb3/8/8/1p6/8/PBPPPK2/2R1QB2 b - - 0 21",
+    "1nb3nr/1p6/8/3p1k2/p4P2/P6N/4P2P/5BK1 w - - 2 26",
+    "2bk1b2/3p3N/2p2p2/p1P1q3/P1P5/5K2/5P2/1r6 w - - 2 26",
+    "8/rp1k4/7n/p2pR2P/1P3P2/2N4P/P2P4/2K5 w - - 1 26",
+    "R1b4k/3p2r1/5Q1p/6p1/8/1P2P3/6B1/2B1K1N1 w - - 1 26",
+    "r4b2/Q7/8/2r1kp2/P7/1P2P3/3P1K2/R5N1 w - - 0 26",
+    "3k4/3b1p2/n1p3R1/1p2b3/1p4P1/8/2r5/6K1 b - - 0 31",
+    "4kbn1/4B3/B1n5/8/1P2P3/2r5/8/5K2 b - - 0 31",
+    "r7/p6p/5k2/1R6/4n3/P6b/8/4K1b1 b - - 1 31",
+)
+
+# Profondità di default di ogni motore (il minimax senza potature è molto più lento)
+DEFAULT_DEPTHS = {algorithm: 3 for algorithm in Algorithms}
+DEFAULT_DEPTHS[Algorithms.MIN_MAX] = 2
+
+# Metriche confrontate tra due esecuzioni: +1 se un valore più alto è un peggioramento, -1 se è un miglioramento
+COMPARED_METRICS = {"time": 1, "nodes": 1, "evaluations": 1, "nps": -1}
+
+CSV_FIELDS = ("algorithm", "generator", "position", "fen", "depth", "best_move", "score", "nodes", "qnodes",
+              "evaluations", "time", "nps")
+
+
+def benchmark_algorithm(algorithm, positions=BENCHMARK_POSITIONS, depth=None, seed=0, children=False):
+    """
+    Esegue il motore `algorithm` su ogni posizione alla profondità indicata (di default
+    `DEFAULT_DEPTHS`), con un agente nuovo per posizione e il generatore di numeri casuali
+    (usato per scegliere tra mosse di pari valore) reinizializzato con `seed`.
+    Con `children` l'agente genera gli stati figli con `get_chess_children` invece di usare make/unmake.
+    Le valutazioni sono contate dalle statistiche dell'agente (`SearchStats`): valutazioni singole,
+    a batch e delle reti.
+    Restituisce una riga di risultati per posizione.
+    """
+    depth = depth or DEFAULT_DEPTHS[algorithm]
+    rows = []
+    for index, fen in enumerate(positions):
+        if children:
+            agent = MinMaxAgent(algorithm, chess_H0, get_chess_children, is_chess_final, search_stats=True)
+        else:
+            agent = MinMaxAgent(algorithm, chess_H0, None, is_chess_final, get_moves_function=get_chess_moves,
+                                search_stats=True)
+        random.seed(seed)
+        board = chess.Board(fen)
+        try:
+            result = agent.find_best_move(board, depth)
+        finally:
+            agent.close()
+        move = agent._move_of(result.best_move) if result.best_move is not None else None
+        rows.append({"algorithm": algorithm.value, "generator": "children" if children else "moves",
+                     "position": index, "fen": fen, "depth": depth,
+                     "best_move": move.uci() if move else None, "score": result.score,
+                     "nodes": result.nodes, "qnodes": agent.qnodes, "evaluations": agent.stats.evaluations,
+                     "time": result.time, "nps": result.nps})
+    return rows
+
+
+def summarize(rows):
+    """
+    Totali per motore: nodi, valutazioni, tempo (e tempo medio per raggiungere la profondità), NPS.
+    """
+    summary = {}
+    for row in rows:
+        totals = summary.setdefault(row["algorithm"], {"positions": 0, "nodes": 0, "evaluations": 0, "time": 0.0})
+        totals["positions"] += 1
+        totals["nodes"] += row["nodes"]
+        totals["evaluations"] += row["evaluations"]
+        totals["time"] += row["time"]
+    for totals in summary.values():
+        totals["time_to_depth"] = totals["time"] / totals["positions"]
+        totals["nps"] = int(totals["nodes"] / totals["time"]) if totals["time"] > 0 else 0
+    return summary
+
+
+def run_benchmark(algorithms=tuple(Algorithms), positions=BENCHMARK_POSITIONS, depth=None, seed=0,
+                  children=False, verbose=True):
+    """
+    Esegue il benchmark dei motori indicati e restituisce il report: parametri dell'esecuzione,
+    risultati per posizione e totali per motore.
+    """
+    rows = []
+    for algorithm in algorithms:
+        algorithm_rows = benchmark_algorithm(algorithm, positions, depth, seed, children)
+        rows.extend(algorithm_rows)
+        if verbose:
+            totals = summarize(algorithm_rows)[algorithm.value]
+            print(f"{algorithm.value:26} depth {algorithm_rows[0]['depth']}  nodes {totals['nodes']:>9}  "
+                  f"evals {totals['evaluations']:>9}  time {totals['time']:8.2f}s  nps {totals['nps']:>7}")
+    return {
+        "meta": {"seed": seed, "depth": depth, "children": children, "positions": len(positions),
+                 "python": platform.python_version(), "chess": chess.__version__,
+                 "date": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": rows,
+        "summary": summarize(rows),
+    }
+
+
+def write_json(report, path):
+    """
+    Salva il report in formato JSON.
+    """
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+def load_json(path):
+    """
+    Legge un report salvato con `write_json`.
+    """
+    with open(path) as file:
+        return json.load(file)
+
+
+def write_csv(report, path):
+    """
+    Salva i risultati per posizione del report in formato CSV.
+    """
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(report["results"])
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Confronta due report sulle ricerche che hanno in comune (stesso motore, generatore, posizione e profondità).
+    Restituisce la lista delle differenze dei totali per motore (motore, metrica, valore di riferimento,
+    valore attuale, variazione relativa, regressione), dove una regressione è un peggioramento oltre
+    `threshold` (0.1 = 10%), e il numero di posizioni in cui la mossa migliore è cambiata per ogni motore.
+    """
+    def key(row):
+        return row["algorithm"], row["generator"], row["fen"], row["depth"]
+
+    baseline_rows = {key(row): row for row in baseline["results"]}
+    common = [row for row in current["results"] if key(row) in baseline_rows]
+    old_summary = summarize([baseline_rows[key(row)] for row in common])
+    new_summary = summarize(common)
+
+    differences = []
+    for algorithm, totals in new_summary.items():
+        for metric, direction in COMPARED_METRICS.items():
+            old, new = old_summary[algorithm][metric], totals[metric]
+            change = (new - old) / old if old else 0.0
+            differences.append({"algorithm": algorithm, "metric": metric, "baseline": old, "current": new,
+                                "change": change, "regression": direction * change > threshold})
+
+    changed_moves = {}
+    for row in common:
+        if baseline_rows[key(row)]["best_move"] != row["best_move"]:
+            changed_moves[row["algorithm"]] = changed_moves.get(row["algorithm"], 0) + 1
+    return differences, changed_moves
+
+
+def print_comparison(differences, changed_moves):
+    """
+    Stampa il confronto di `compare` e restituisce True se ci sono regressioni.
+    """
+    for difference in differences:
+        flag = "REGRESSION" if difference["regression"] else ""
+        print(f"{difference['algorithm']:26} {difference['metric']:12} {difference['baseline']:>14.6g} -> "
+              f"{difference['current']:<14.6g} {difference['change']:+7.1%} {flag}")
+    for algorithm, changed in changed_moves.items():
+        print(f"{algorithm:26} best move changed in {changed} positions")
+    return any(difference["regression"] for difference in differences)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the search engines on a fixed set of positions.")
+    parser.add_argument("--algorithms", default=",".join(algorithm.value for algorithm in Algorithms),
+                        help="comma-separated engines to run (default: all)")
+    parser.add_argument("--depth", type=int, help="search depth (default: DEFAULT_DEPTHS of each engine)")
+    parser.add_argument("--positions", type=int, default=len(BENCHMARK_POSITIONS),
+                        help="run only the first N positions")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random tie-breaking")
+    parser.add_argument("--children", action="store_true", help="generate successors with get_chess_children")
+    parser.add_argument("--json", help="write the report to this JSON file")
+    parser.add_argument("--csv", help="write the per-position results to this CSV file")
+    parser.add_argument("--baseline", help="JSON report to compare this run against")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="compare two JSON reports without running the benchmark")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative worsening reported as a regression (default: 0.1)")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = print_comparison(*compare(load_json(args.compare[0]), load_json(args.compare[1]),
+                                                args.threshold))
+        raise SystemExit(1 if regressions else 0)
+
+    algorithms = [Algorithms(name) for name in args.algorithms.split(",")]
+    report = run_benchmark(algorithms, BENCHMARK_POSITIONS[:args.positions], args.depth, args.seed, args.children)
+    if args.json:
+        write_json(report, args.json)
+    if args.csv:
+        write_csv(report, args.csv)
+    if args.baseline:
+        regressions = print_comparison(*compare(load_json(args.baseline), report, args.threshold))
+        raise SystemExit(1 if regressions else 0)
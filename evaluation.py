@@ -0,0 +1,118 @@
+import chess
+
+# Gli stessi termini di `chess_H0`: materiale e bonus per i pezzi sulle case centrali
+PIECE_VALUES = [0, 100, 320, 330, 500, 900, 0]  # indicizzati per chess.PieceType
+CENTER_SQUARES = [chess.D4, chess.E4, chess.D5, chess.E5]
+CENTER_BONUS = 10
+
+
+def _build_piece_square_values():
+    """
+    Costruisce la tabella [colore][tipo di pezzo][casa] con il valore di ogni pezzo su ogni casa,
+    dal punto di vista del Bianco (positivo per il Bianco, negativo per il Nero).
+    """
+    table = [[[0] * 64 for _ in range(7)] for _ in range(2)]
+    for piece_type in chess.PIECE_TYPES:
+        for square in chess.SQUARES:
+            value = PIECE_VALUES[piece_type] + (CENTER_BONUS if square in CENTER_SQUARES else 0)
+            table[chess.WHITE][piece_type][square] = value
+            table[chess.BLACK][piece_type][square] = -value
+    return table
+
+
+PIECE_SQUARE_VALUES = _build_piece_square_values()
+
+
+class IncrementalEvaluator:
+    """
+    Incrementally-updated version of the static part of `chess_H0` (material and centre bonus).
+
+    The score is kept as a running sum from White's point of view and updated by the
+    `make_move`/`unmake_move` hooks, which replace `make_chess_move`/`unmake_chess_move`,
+    so `evaluate` is O(1). Terminal positions are not detected here: the search does it.
+
+    The evaluator follows one board at a time; if it is asked about a different board
+    (or the board was changed without its hooks) it recomputes the sum from scratch.
+    """
+
+    def __init__(self):
+        self._board = None
+        self._length = -1
+        self._stack = []
+        self.score = 0
+
+    def reset(self, board: chess.Board):
+        """
+        Recomputes the running sum for `board` and starts following it.
+        """
+        values = PIECE_SQUARE_VALUES
+        self.score = sum(values[piece.color][piece.piece_type][square]
+                         for square, piece in board.piece_map().items())
+        self._board = board
+        self._length = len(board.move_stack)
+        self._stack = []
+
+    def _sync(self, board):
+        if board is not self._board or len(board.move_stack) != self._length:
+            self.reset(board)
+
+    def _delta(self, board: chess.Board, move: chess.Move):
+        """
+        Variazione del punteggio (dal punto di vista del Bianco) prodotta dalla mossa.
+        """
+        values = PIECE_SQUARE_VALUES
+        color = board.turn
+        piece_type = board.piece_type_at(move.from_square)
+        delta = -values[color][piece_type][move.from_square]
+
+        if board.is_castling(move):
+            rank = chess.square_rank(move.from_square)
+            if board.is_kingside_castling(move):
+                king_to, rook_to, rook_file = chess.square(6, rank), chess.square(5, rank), 7
+            else:
+                king_to, rook_to, rook_file = chess.square(2, rank), chess.square(3, rank), 0
+            # In Chess960 la mossa di arrocco è codificata come "re cattura torre"
+            rook_from = move.to_square if board.chess960 else chess.square(rook_file, rank)
+            return (delta + values[color][chess.KING][king_to]
+                    - values[color][chess.ROOK][rook_from] + values[color][chess.ROOK][rook_to])
+
+        delta += values[color][move.promotion or piece_type][move.to_square]
+        if board.is_en_passant(move):
+            captured_square = move.to_square + (-8 if color == chess.WHITE else 8)
+            delta -= values[not color][chess.PAWN][captured_square]
+        else:
+            captured = board.piece_type_at(move.to_square)
+            if captured:
+                delta -= values[not color][captured][move.to_square]
+        return delta
+
+    def make_move(self, board: chess.Board, move: chess.Move):
+        """
+        Make hook: updates the running sum, then pushes the move on the board and returns it.
+        """
+        self._sync(board)
+        self._stack.append(self.score)
+        if move:
+            self.score += self._delta(board, move)
+        board.push(move)
+        self._length += 1
+        return board
+
+    def unmake_move(self, board: chess.Board, move: chess.Move):
+        """
+        Unmake hook: pops the move from the board and restores the previous sum.
+        """
+        board.pop()
+        if board is self._board and self._stack:
+            self.score = self._stack.pop()
+            self._length -= 1
+        else:
+            self.reset(board)
+
+    def evaluate(self, board: chess.Board):
+        """
+        Static evaluation of `board` from the point of view of the side to move, like `chess_H0`
+        (without the detection of terminal positions).
+        """
+        self._sync(board)
+        return self.score if board.turn == chess.WHITE else -self.score
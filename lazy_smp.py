@@ -0,0 +1,107 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import chess
+
+# Stato dei processi helper, inizializzato una volta sola da `_init_helper`
+_helper_agent = None
+_helper_search_id = None
+
+
+def _init_helper(agent_args, tt_name, stop_event):
+    """
+    Crea l'agente sequenziale del processo helper, collegato alla tabella condivisa.
+    """
+    global _helper_agent
+    # Import locale: minmax_agent importa questo modulo
+    from minmax_agent import MinMaxAgent
+    from transposition_table import SharedTranspositionTable
+    _helper_agent = MinMaxAgent(**agent_args, tt_size_mb=0)
+    _helper_agent.tt = SharedTranspositionTable(name=tt_name)
+    _helper_agent.stop_event = stop_event
+
+
+def _helper_search(fen, depth, search_id, helper_index, age):
+    """
+    Approfondimento iterativo di un helper sulla stessa radice, fino a `depth` + 1
+    o finché il processo principale non lo ferma. Scrive nella tabella con l'età `age`
+    di quella del processo principale. Restituisce i nodi visitati.
+    """
+    global _helper_search_id
+    from minmax_agent import SearchTimeout
+
+    agent = _helper_agent
+    if search_id != _helper_search_id:
+        agent._new_search()
+        _helper_search_id = search_id
+    # Con la stessa età del processo principale le sue voci più profonde non vengono sostituite
+    agent.tt.age = age
+    nodes_before = agent.nodes
+
+    board = chess.Board(fen)
+    # Metà degli helper parte un livello più avanti, così i worker non cercano gli stessi nodi
+    try:
+        for d in range(1 + helper_index % 2, depth + 2):
+            agent.engine(board, d, maximizing_player=True)
+    except SearchTimeout:
+        pass
+    return agent.nodes - nodes_before
+
+
+class LazySMPSearch:
+    """
+    Lazy SMP: helper processes search the same root as the main process, at staggered
+    depths, and communicate only through a `SharedTranspositionTable`. The entries they
+    store let the main search cut or order nodes it has not searched yet.
+
+    The pool is created on first use and reused across searches.
+    """
+
+    def __init__(self, agent_args: dict, tt_name: str, helpers: int):
+        """
+        Args:
+            agent_args (dict): Keyword arguments used to build the sequential agent of every helper.
+                Functions must be defined at module level so they can be pickled.
+            tt_name (str): Name of the shared memory block of the transposition table.
+            helpers (int): Number of helper processes.
+        """
+        self.agent_args = agent_args
+        self.tt_name = tt_name
+        self.helpers = helpers
+        self._pool = None
+        self._stop = None
+        self._search_id = 0
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._stop = multiprocessing.Event()
+            self._pool = ProcessPoolExecutor(max_workers=self.helpers, initializer=_init_helper,
+                                             initargs=(self.agent_args, self.tt_name, self._stop))
+        return self._pool
+
+    def start(self, fen, depth, age):
+        """
+        Starts the helpers on the given root and returns their futures. The helpers store their
+        entries with the main table's `age`, so that the replacement policy compares them with
+        the main search's entries.
+        """
+        pool = self._ensure_pool()
+        self._search_id += 1
+        self._stop.clear()
+        return [pool.submit(_helper_search, fen, depth, self._search_id, i, age) for i in range(self.helpers)]
+
+    def stop(self, futures):
+        """
+        Stops the helpers and returns the total number of nodes they visited.
+        """
+        self._stop.set()
+        nodes = sum(future.result() for future in futures)
+        self._stop.clear()
+        return nodes
+
+    def close(self):
+        """
+        Shuts down the helper pool.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -1,6 +1,18 @@
+import math
 import random
+import time
 from enum import Enum
+import numpy as np
 import chess # Importa la libreria python-chess
+import chess.polyglot
+from transposition_table import TranspositionTable, SharedTranspositionTable, EXACT, LOWERBOUND, UPPERBOUND, flip_bound
+from move_ordering import MoveOrderer, mvv_lva, is_noisy
+from parallel_search import RootParallelSearch
+from lazy_smp import LazySMPSearch
+from batch_evaluation import chess_H0_batch, encode_boards, encode_children, checking_candidates
+from policy_network import PolicyNetwork, MultiInputNetwork, FeatureExtractor
+from search_result import SearchResult
+from search_stats import SearchStats
 
 class Algorithms(Enum):
     """Enumeration for different search algorithms."""
@@ -10,6 +22,40 @@ class Algorithms(Enum):
     BRANCHING_LIMIT = "branching_limit"
     PRED_BLMINMAX = "pred_blminmax"
     MULTI_INPUT_PRED_BLMINMAX = "multi_input_pred_blminmax"
+    LAZY_SMP = "lazy_smp"
+    BATCH_BRANCHING_LIMIT = "batch_branching_limit"
+    PVS = "pvs"
+    MTDF = "mtdf"
+
+# Motori che supportano l'esclusione delle mosse della radice (multi-PV)
+MULTI_PV_ALGORITHMS = (Algorithms.FAIL_HARD_ALPHA_BETA, Algorithms.FAIL_SOFT_ALPHA_BETA, Algorithms.PVS,
+                       Algorithms.MTDF, Algorithms.LAZY_SMP)
+
+# Ogni quanti nodi la ricerca controlla il tempo e il budget di nodi (maschera di bit)
+LIMITS_CHECK_MASK = 127
+
+# Distanza massima dalla radice delle variazioni principali (dimensione della tabella triangolare)
+MAX_PLY = 256
+
+# Late move reductions: le prime LMR_MIN_MOVES mosse di un nodo sono sempre cercate a profondità piena,
+# le successive vengono ridotte di LMR_TABLE[profondità][numero della mossa] semimosse
+LMR_MIN_MOVES = 3
+LMR_TABLE = [[0 if depth == 0 or index == 0 else int(0.75 + math.log(depth) * math.log(index) / 2.25)
+              for index in range(64)] for depth in range(64)]
+
+# Punteggio di uno scacco matto alla radice: un matto a `ply` semimosse dalla radice vale MATE_SCORE - ply,
+# così la ricerca preferisce il matto più corto (e il più lungo quando lo subisce)
+MATE_SCORE = 1000000
+MATE_THRESHOLD = MATE_SCORE - 1000
+
+def is_mate_score(value):
+    """
+    Verifica se un valore della ricerca indica uno scacco matto (anche infinito).
+    """
+    return abs(value) >= MATE_THRESHOLD
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time or node budget is exhausted or the stop event is set."""
 
 # --- Funzioni di gioco per gli scacchi (per essere passate all'AI Agent) ---
 def get_chess_children(board: chess.Board):
@@ -24,6 +70,39 @@ def get_chess_children(board: chess.Board):
         children_boards.append(new_board)
     return children_boards
 
+def get_chess_moves(board: chess.Board):
+    """
+    Genera la lista delle mosse legali dalla board corrente, senza copiare la board.
+    """
+    return list(board.legal_moves)
+
+def make_chess_move(board: chess.Board, move: chess.Move):
+    """
+    Applica la mossa sulla board stessa (push) e la restituisce.
+    """
+    board.push(move)
+    return board
+
+def unmake_chess_move(board: chess.Board, move: chess.Move):
+    """
+    Annulla l'ultima mossa applicata sulla board (pop).
+    """
+    board.pop()
+
+def _make_child(state, child):
+    # Con get_children_function le "mosse" sono direttamente gli stati successori
+    return child
+
+def _unmake_child(state, child):
+    pass
+
+def chess_final_H0(board: chess.Board):
+    """
+    Valore di uno stato finale dal punto di vista del giocatore di turno:
+    infinito negativo se ha subito scacco matto, 0 in caso di patta.
+    """
+    return float('-inf') if board.is_checkmate() else 0
+
 def is_chess_final(board: chess.Board):
     """
     Verifica se il gioco è terminato.
@@ -34,7 +113,7 @@ def chess_H0(board: chess.Board):
     """
     Una funzione euristica statica di base per gli scacchi.
     Assegna valori ai pezzi e considera gli stati finali.
-    Valori positivi indicano un vantaggio per il Bianco, negativi per il Nero.
+    Il valore è dal punto di vista del giocatore di turno: positivo se è in vantaggio.
     """
     score = 0
     piece_values = {
@@ -63,12 +142,9 @@ def chess_H0(board: chess.Board):
     
     # Gestione degli stati finali (molto importante per evitare che l'AI non veda i checkmate)
     if board.is_checkmate():
-        # Se è scacco matto, il valore è infinito positivo o negativo a seconda di chi vince
-        # `board.turn` è il giocatore il cui turno è, quindi se `board.turn` è WHITE e checkmate, BLACK ha vinto.
-        if board.turn == chess.WHITE: # Il Bianco è in scacco matto
-            return float('-inf') # Il valore per il Bianco è molto negativo
-        else: # Il Nero è in scacco matto
-            return float('inf') # Il valore per il Bianco è molto positivo
+        # Se è scacco matto, ha perso il giocatore di turno (`board.turn`):
+        # il valore dal suo punto di vista è infinito negativo.
+        return float('-inf')
     elif board.is_stalemate() or board.is_insufficient_material() or board.is_fivefold_repetition() or board.is_seventyfive_moves():
         return 0 # Pareggio
 
@@ -87,7 +163,15 @@ class MinMaxAgent:
     search algorithms, including Alpha-Beta pruning and branch-limited search.
     """
 
-    def __init__(self, algorithm_type: Algorithms, H0_function, get_children_function, is_final_function):
+    def __init__(self, algorithm_type: Algorithms, H0_function, get_children_function, is_final_function,
+                 tt_size_mb: float = 16, hash_function=chess.polyglot.zobrist_hash,
+                 get_moves_function=None, make_move_function=None, unmake_move_function=None,
+                 quiescence_depth: int = 4, move_ordering: bool = True, move_orderer=None,
+                 workers: int = 1, evaluator=None, H0_batch_function=chess_H0_batch,
+                 predictor=None, multi_input_predictor=None, first_guess="previous",
+                 aspiration_widths=(50, 200, 800), null_move: bool = True, late_move_reductions: bool = True,
+                 futility_margins=(150, 300, 500), razoring_margins=(300,),
+                 check_extensions: bool = True, search_stats: bool = False):
         """
         Initializes the MinMaxAgent with a specific search algorithm.
 
@@ -96,11 +180,129 @@ class MinMaxAgent:
             H0_function (callable): A function that takes a state and returns its static heuristic evaluation.
             get_children_function (callable): A function that takes a state and returns a list of its successor states.
             is_final_function (callable): A function that takes a state and returns True if it's a terminal state.
+            tt_size_mb (float): Memory budget of the transposition table used by the alpha-beta engines (0 disables it).
+            hash_function (callable): A function that takes a state and returns its 64-bit hash key.
+            get_moves_function (callable): A function that takes a state and returns a list of its moves.
+                When given, the engines search a single state with make/unmake instead of
+                generating successor states, and get_children_function may be None.
+            make_move_function (callable): A function (state, move) that applies the move and returns the new state.
+                Defaults to `make_chess_move`.
+            unmake_move_function (callable): A function (state, move) that takes back the move.
+                Defaults to `unmake_chess_move`.
+            quiescence_depth (int): Maximum depth of the capture/promotion search run at the horizon
+                of the alpha-beta engines (0 disables it).
+            move_ordering (bool): Whether the alpha-beta engines order their moves (hash move, MVV-LVA,
+                killer moves, history heuristic). When False only the hash move is tried first.
+            move_orderer (MoveOrderer): A custom move orderer; defaults to a new `MoveOrderer`.
+            workers (int): Number of worker processes for the root-parallel search of the alpha-beta
+                engines (1 searches sequentially), or total number of searching processes for
+                Lazy SMP. All the functions above must be picklable.
+            evaluator (IncrementalEvaluator): An incrementally-updated evaluator. When given, it replaces
+                H0_function (which may be None) and the make/unmake hooks, the agent searches with
+                make/unmake and terminal states are scored by the search with `chess_final_H0`.
+            H0_batch_function (callable): A function that takes an (n, 13) array of positions encoded with
+                `encode_boards` and returns their n static evaluations; used to rank the children
+                in the batch branch-limited engine.
+            predictor (PolicyNetwork | str): The network (or the path of its .npz weights file) that ranks
+                the children in Pred-BLMinMax; defaults to a network equivalent to the static part of H0.
+            multi_input_predictor (MultiInputNetwork | str): The same for Multi-Input Pred-BLMinMax,
+                whose network reads the features built by `FeatureExtractor`.
+            first_guess (str | callable): First guess of MTD(f): "previous" (the score of the previous
+                search on the same game line, or else the static evaluation), "static" (the static evaluation
+                of the root), or a function that takes the root state and returns the guess (picklable
+                when workers > 1).
+            aspiration_widths (tuple): Half-widths of the successive aspiration windows of the fail-soft
+                engine's root searches, centred on the previous score; after a fail-low or fail-high
+                with the last width the search is repeated with an infinite bound. Empty disables them.
+            null_move (bool): Whether the alpha-beta engines use null-move pruning.
+            late_move_reductions (bool): Whether the fail-soft engine searches late quiet moves at
+                reduced depth (see `LMR_TABLE`).
+            futility_margins (tuple): Margins of futility and reverse futility pruning at depth 1, 2, 3...
+                of the alpha-beta engines (no pruning beyond the last one; empty disables them).
+            razoring_margins (tuple): Margins of razoring at depth 1, 2, 3... (empty disables it).
+                Beyond depth 1 the fail-low is confirmed by a reduced-depth zero-window search.
+            check_extensions (bool): Whether the alpha-beta engines search the moves that give check
+                one ply deeper (up to twice the root depth from the root).
+            search_stats (bool): Whether to collect a `SearchStats` of every search (see `enable_stats`).
         """
         self.H_0 = H0_function
+        self.final_H0 = H0_function
         self.get_children = get_children_function
         self.is_final = is_final_function
+        self.H0_batch = H0_batch_function
+        self.predictor = PolicyNetwork.load(predictor) if isinstance(predictor, str) else (predictor or PolicyNetwork())
+        self.mi_predictor = (MultiInputNetwork.load(multi_input_predictor) if isinstance(multi_input_predictor, str)
+                             else (multi_input_predictor or MultiInputNetwork()))
+        self.feature_extractor = FeatureExtractor()
+
+        self.evaluator = evaluator
+        if evaluator is not None:
+            self.H_0 = evaluator.evaluate
+            self.final_H0 = chess_final_H0
+            get_moves_function = get_moves_function or get_chess_moves
+            make_move_function = evaluator.make_move
+            unmake_move_function = evaluator.unmake_move
+
+        if get_moves_function is not None:
+            self.move_mode = True
+            self.get_moves = get_moves_function
+            self.make_move = make_move_function or make_chess_move
+            self.unmake_move = unmake_move_function or unmake_chess_move
+        elif get_children_function is not None:
+            self.move_mode = False
+            self.get_moves = get_children_function
+            self.make_move = _make_child
+            self.unmake_move = _unmake_child
+        else:
+            raise ValueError("Either get_children_function or get_moves_function must be provided.")
+        self.hash = hash_function
+        self.tt = TranspositionTable(tt_size_mb) if tt_size_mb > 0 else None
+        self.quiescence_depth = quiescence_depth
+        self.move_orderer = (move_orderer or MoveOrderer()) if move_ordering else None
+
+        self.nodes = 0
+        self.qnodes = 0
+        self.null_window_searches = 0
+        self.researches = 0
+        self.mtdf_passes = 0
+        self.aspiration_searches = 0
+        self.aspiration_fail_lows = 0
+        self.aspiration_fail_highs = 0
+        self.completed_depth = 0
+        self.first_guess = first_guess
+        self.aspiration_widths = tuple(aspiration_widths)
+        self.null_move = null_move
+        self.null_move_searches = 0
+        self.null_move_cutoffs = 0
+        self.late_move_reductions = late_move_reductions
+        self.lmr_reductions = 0
+        self.lmr_researches = 0
+        self.futility_margins = tuple(futility_margins)
+        self.razoring_margins = tuple(razoring_margins)
+        self.futility_prunes = 0
+        self.reverse_futility_prunes = 0
+        self.razor_prunes = 0
+        self.check_extensions = check_extensions
+        self.extensions = 0
+        self.mate_distance_prunes = 0
+        self._root_depth = 0
+        # Mosse della radice escluse dalla ricerca (multi-PV)
+        self._excluded_root_moves = set()
+        # Tabella triangolare delle variazioni principali: la riga `ply` contiene, dalla colonna `ply`
+        # fino a _pv_length[ply], la variazione del nodo a distanza `ply` dalla radice
+        self._pv_table = [[None] * MAX_PLY for _ in range(MAX_PLY)]
+        self._pv_length = [0] * MAX_PLY
+        self.seldepth = 0
+        # Punteggio dell'ultima ricerca e hash della sua radice (vedi `_previous_score_at`)
+        self._previous_score = None
+        self._previous_root = None
+        self._deadline = None
+        self._max_nodes = None
+        self._root_hint = None
+        # Evento (threading o multiprocessing) che, se impostato, interrompe la ricerca
+        self.stop_event = None
 
+        self.algorithm_type = algorithm_type
         self.engine = None
         match algorithm_type:
             case Algorithms.MIN_MAX:
@@ -108,150 +310,1193 @@ class MinMaxAgent:
             case Algorithms.FAIL_HARD_ALPHA_BETA:
                 self.engine = self.fhabminmax
             case Algorithms.FAIL_SOFT_ALPHA_BETA:
-                self.engine = self.fsabminmax
+                self.engine = self.aspiration_search if self.aspiration_widths else self.fsabminmax
             case Algorithms.BRANCHING_LIMIT:
                 self.engine = self.blminmax
             case Algorithms.PRED_BLMINMAX:
                 self.engine = self.pred_blminmax
             case Algorithms.MULTI_INPUT_PRED_BLMINMAX:
                 self.engine = self.mi_pred_blminmax
+            case Algorithms.LAZY_SMP:
+                self.engine = self.lazy_smp
+            case Algorithms.BATCH_BRANCHING_LIMIT:
+                self.engine = self.batch_blminmax
+            case Algorithms.PVS:
+                self.engine = self.pvs
+            case Algorithms.MTDF:
+                if tt_size_mb <= 0:
+                    raise ValueError("MTD(f) needs a transposition table (tt_size_mb > 0).")
+                self.engine = self.mtdf
             case _:
                 raise ValueError(
                     f"Invalid engine type. Choose between {', '.join([engine.value for engine in Algorithms])}")
 
+        worker_args = dict(H0_function=H0_function,
+                           get_children_function=get_children_function, is_final_function=is_final_function,
+                           hash_function=hash_function,
+                           get_moves_function=get_moves_function, make_move_function=make_move_function,
+                           unmake_move_function=unmake_move_function, quiescence_depth=quiescence_depth,
+                           move_ordering=move_ordering, move_orderer=move_orderer, evaluator=evaluator,
+                           H0_batch_function=H0_batch_function, predictor=self.predictor,
+                           multi_input_predictor=self.mi_predictor, first_guess=first_guess,
+                           aspiration_widths=aspiration_widths, null_move=null_move,
+                           late_move_reductions=late_move_reductions, futility_margins=futility_margins,
+                           razoring_margins=razoring_margins, check_extensions=check_extensions)
+        self.root_parallel = None
+        self.lazy_smp_search = None
+        if algorithm_type == Algorithms.LAZY_SMP:
+            if tt_size_mb <= 0:
+                raise ValueError("Lazy SMP needs a transposition table (tt_size_mb > 0).")
+            self.tt = SharedTranspositionTable(tt_size_mb)
+            if workers > 1:
+                self.lazy_smp_search = LazySMPSearch(
+                    dict(worker_args, algorithm_type=Algorithms.FAIL_SOFT_ALPHA_BETA), self.tt.name, workers - 1)
+        elif workers > 1:
+            if algorithm_type not in (Algorithms.FAIL_HARD_ALPHA_BETA, Algorithms.FAIL_SOFT_ALPHA_BETA, Algorithms.PVS):
+                raise ValueError("Parallel root search is only available for the alpha-beta engines.")
+            self.root_parallel = RootParallelSearch(
+                dict(worker_args, algorithm_type=algorithm_type, tt_size_mb=tt_size_mb), workers)
+            self.sequential_engine = self.engine
+            self.engine = self.parallel_root_search
+
+        self.stats = None
+        self._uninstrumented = None
+        if search_stats:
+            self.enable_stats()
+
+    def enable_stats(self):
+        """
+        Enables the search instrumentation: the generation (including the quiescence captures),
+        evaluation and cutoff functions are replaced by wrappers that update `self.stats`, a
+        `SearchStats` reset at every search.
+        Only the searches run in this process are measured (not the workers of the parallel searches).
+        """
+        if self.stats is not None:
+            return
+        self.stats = SearchStats()
+        self._uninstrumented = (self.get_moves, self.H_0, self.final_H0, self.H0_batch, self.predictor,
+                                self.mi_predictor)
+        self.get_moves = self.stats.wrap_generation(self.get_moves)
+        self.H_0 = self.stats.wrap_evaluation(self.H_0)
+        self.final_H0 = self.stats.wrap_evaluation(self.final_H0)
+        self.H0_batch = self.stats.wrap_batch_evaluation(self.H0_batch)
+        self.predictor = self.stats.wrap_batch_evaluation(self.predictor)
+        self.mi_predictor = self.stats.wrap_batch_evaluation(self.mi_predictor)
+        # Gli attributi d'istanza nascondono i metodi; rimuovendoli tornano i metodi originali
+        self._generate_noisy = self.stats.wrap_generation(self._generate_noisy)
+        self._record_cutoff = self.stats.wrap_cutoff(self._record_cutoff)
+
+    def disable_stats(self):
+        """
+        Disables the search instrumentation, restoring the original functions.
+        """
+        if self.stats is None:
+            return
+        (self.get_moves, self.H_0, self.final_H0, self.H0_batch, self.predictor,
+         self.mi_predictor) = self._uninstrumented
+        del self._record_cutoff
+        del self._generate_noisy
+        self.stats = None
+        self._uninstrumented = None
+
     def find_best_move(self, current_state, depth):
         """
         Finds the best move from the current state using the selected engine.
-        Returns the best value and the best successor state.
+        Returns a `SearchResult`, which also unpacks as (best value, best move): the move is a
+        `chess.Move` when the agent searches with make/unmake hooks, the best successor state otherwise,
+        and None when the root is terminal or `depth` is 0.
+        If `stop_event` is set during the search, the state is restored and `SearchTimeout` is raised.
+        """
+        self._new_search(current_state)
+        start = time.perf_counter()
+        root_ply = len(current_state.move_stack) if self.move_mode else None
+        try:
+            value, move = self._search_root(current_state, depth)
+        finally:
+            # Una ricerca interrotta lascia sulla board le mosse che stava esplorando
+            self._restore(current_state, root_ply)
+        return self._result(current_state, value, move, depth, start)
+
+    def _search_root(self, state, depth):
+        """
+        Runs the engine on the root.
         """
+        self._pv_length[0] = 0
         # Sempre chiamare l'algoritmo interno con True per il maximizing_player
         # in quanto il valore di H0 è già normalizzato rispetto al giocatore di turno.
-        return self.engine(current_state, depth, True) 
+        return self.engine(state, depth, maximizing_player=True)
+
+    def _result(self, state, value, move, depth, start):
+        """
+        Builds the `SearchResult` of a root search started at time `start`.
+        """
+        elapsed = time.perf_counter() - start
+        if self.stats is not None:
+            self.stats.nodes, self.stats.time, self.stats.depth = self.nodes, elapsed, depth
+        return SearchResult(move, value, self._principal_variation(state, move, depth), depth,
+                            max(self.seldepth, depth), self.nodes, elapsed)
+
+    def _principal_variation(self, state, move, depth):
+        """
+        Principal variation of the last root search: the line collected in the triangular PV table
+        (if it starts with the best move), completed with the transposition table.
+        """
+        if move is None:
+            return []
+        chess_move = self._move_of(move)
+        length = self._pv_length[0]
+        if length and self._pv_table[0][0] == chess_move:
+            pv = self._pv_table[0][:length]
+        else:
+            pv = [chess_move]
+        return self._pv_from_tt(state, pv, depth)
+
+    def _update_pv(self, ply, move):
+        """
+        Triangular PV update after `move` became the best move of the node at `ply`: the variation
+        of the node becomes the move followed by the variation of its child, copied in place.
+        """
+        table = self._pv_table
+        row, child_row = table[ply], table[ply + 1]
+        row[ply] = self._move_of(move)
+        length = self._pv_length[ply + 1]
+        for i in range(ply + 1, length):
+            row[i] = child_row[i]
+        self._pv_length[ply] = max(length, ply + 1)
+
+    def find_best_move_timed(self, current_state, time_ms, max_nodes=None, max_depth=64, on_iteration=None):
+        """
+        Iterative deepening: searches depth 1, 2, 3... with the selected engine until the
+        time budget (in milliseconds) or the optional node budget is exhausted.
+        `on_iteration`, if given, is called with the `SearchResult` of every completed iteration.
+        Returns the `SearchResult` of the last completed iteration (with no move if the search
+        was stopped through `stop_event` during the first one).
+        """
+        self._new_search(current_state)
+        start = time.perf_counter()
+        budget = time_ms / 1000
+        root_ply = len(current_state.move_stack) if self.move_mode else None
+        result = SearchResult(None, None)
+
+        try:
+            for depth in range(1, max_depth + 1):
+                # La prima iterazione viene sempre completata, così c'è sempre una mossa da restituire
+                if depth > 1:
+                    self._deadline = start + budget
+                    self._max_nodes = max_nodes
+                try:
+                    value, move = self._search_root(current_state, depth)
+                except SearchTimeout:
+                    self._restore(current_state, root_ply)
+                    break
+                result = self._result(current_state, value, move, depth, start)
+                self.completed_depth = depth
+                if on_iteration is not None:
+                    on_iteration(result)
+                # La mossa migliore di questa iterazione viene provata per prima nella successiva
+                self._root_hint = self._move_of(move) if move is not None else None
+
+                # Se è già passata metà del tempo difficilmente l'iterazione successiva terminerà
+                if time.perf_counter() - start >= budget / 2 or is_mate_score(value):
+                    break
+        finally:
+            self._deadline = None
+            self._max_nodes = None
+            self._root_hint = None
+
+        # I nodi e il tempo comprendono anche l'eventuale iterazione interrotta
+        result.nodes = self.nodes
+        result.time = time.perf_counter() - start
+        result.nps = int(result.nodes / result.time) if result.time > 0 else 0
+        if self.stats is not None:
+            self.stats.nodes, self.stats.time = result.nodes, result.time
+        return result
+
+    def find_multi_pv(self, current_state, depth, num_pv):
+        """
+        Multi-PV analysis: finds the `num_pv` best moves with their exact values and principal
+        variations in a single search call of an alpha-beta engine. Every pass searches the root
+        without the moves already found, reusing the transposition table filled by the previous
+        passes; the variations are read back from the table.
+
+        Selective pruning and reductions (null move, LMR, futility, razoring) make the value of
+        the moves after the best one inexact, so they are disabled for the analysis, which runs
+        in this process only (the workers of the parallel searches keep their options).
+        Returns a list of `SearchResult`s from the best move down (nodes and time are cumulative).
+        If `stop_event` is set during the analysis, the state is restored and `SearchTimeout` is raised.
+        """
+        if self.algorithm_type not in MULTI_PV_ALGORITHMS:
+            raise ValueError("Multi-PV is only available for the alpha-beta engines.")
+        options = (self.engine, self.null_move, self.late_move_reductions, self.futility_margins,
+                   self.razoring_margins)
+        if self.root_parallel is not None:
+            self.engine = self.sequential_engine
+        elif self.algorithm_type == Algorithms.LAZY_SMP:
+            self.engine = self.fsabminmax
+        self.null_move, self.late_move_reductions, self.futility_margins, self.razoring_margins = False, False, (), ()
+
+        self._new_search(current_state)
+        start = time.perf_counter()
+        root_ply = len(current_state.move_stack) if self.move_mode else None
+        lines = []
+        try:
+            for _ in range(num_pv):
+                value, move = self._search_root(current_state, depth)
+                # Tutte le mosse della radice sono già state trovate (o la partita è finita)
+                if move is None:
+                    break
+                lines.append(self._result(current_state, value, move, depth, start))
+                self._excluded_root_moves.add(self._move_of(move))
+        finally:
+            self._restore(current_state, root_ply)
+            self._excluded_root_moves = set()
+            (self.engine, self.null_move, self.late_move_reductions, self.futility_margins,
+             self.razoring_margins) = options
+        # A parità di valore resta l'ordine in cui le mosse sono state trovate
+        return sorted(lines, key=lambda line: line.score, reverse=True)
+
+    def _exclude_root_moves(self, moves):
+        """
+        Removes the moves excluded by the multi-PV search from the root moves.
+        """
+        return [move for move in moves if self._move_of(move) not in self._excluded_root_moves]
+
+    def _pv_from_tt(self, state, pv, max_length):
+        """
+        Extends the variation `pv` (played from `state`) with the best moves stored in the
+        transposition table, as long as they are legal and no position repeats.
+        """
+        if self.tt is None or len(pv) >= max_length:
+            return pv
+        board = state.copy()
+        for move in pv:
+            board.push(move)
+        seen = {self.hash(board)}
+        while len(pv) < max_length:
+            entry = self.tt.probe(self.hash(board))
+            if entry is None or entry[3] is None or not board.is_legal(entry[3]):
+                break
+            board.push(entry[3])
+            key = self.hash(board)
+            if key in seen:
+                break
+            seen.add(key)
+            pv.append(entry[3])
+        return pv
+
+    def parallel_root_search(self, state, L, maximizing_player=True):
+        """
+        Root-parallel search: the root moves are ordered here and searched by the sequential
+        engine in the worker processes (see `RootParallelSearch`).
+        """
+        moves = self.get_moves(state)
+        if self._excluded_root_moves:
+            moves = self._exclude_root_moves(moves)
+        if L <= 1 or len(moves) < 2 or self.is_final(state):
+            return self.sequential_engine(state, L, maximizing_player=maximizing_player)
+
+        moves = self._order_moves(state, moves, 0, self._root_hint)
+        # I nodi rimasti del budget limitano ogni mossa della radice; il totale si controlla qui
+        remaining = max(self._max_nodes - self.nodes, 0) if self._max_nodes is not None else None
+        value, index, nodes, pv, seldepth = self.root_parallel.search(
+            state.fen(), [self._move_of(move) for move in moves], L, self._deadline, self.stop_event, remaining)
+        self.nodes += nodes
+        if value is None or (self._max_nodes is not None and self.nodes >= self._max_nodes):
+            raise SearchTimeout()
+
+        # La variazione del worker che ha cercato la mossa migliore diventa la riga della radice
+        row = self._pv_table[0]
+        row[0] = self._move_of(moves[index])
+        for i, uci in enumerate(pv, 1):
+            row[i] = chess.Move.from_uci(uci)
+        self._pv_length[0] = len(pv) + 1
+        self.seldepth = max(self.seldepth, seldepth)
+        return value, moves[index]
+
+    def lazy_smp(self, state, L, maximizing_player=True):
+        """
+        Lazy SMP search: while this process runs the fail-soft alpha-beta search to depth L,
+        the helper processes search the same root at staggered depths. They share nothing but
+        the transposition table, which lives in shared memory (see `LazySMPSearch`).
+        """
+        if self.lazy_smp_search is None or L <= 1:
+            return self.fsabminmax(state, L, maximizing_player=maximizing_player)
+
+        futures = self.lazy_smp_search.start(state.fen(), L, self.tt.age)
+        try:
+            return self.fsabminmax(state, L, maximizing_player=maximizing_player)
+        finally:
+            self.nodes += self.lazy_smp_search.stop(futures)
+
+    def close(self):
+        """
+        Releases the worker processes of the parallel searches and the shared memory, if any.
+        """
+        if self.root_parallel is not None:
+            self.root_parallel.close()
+        if self.lazy_smp_search is not None:
+            self.lazy_smp_search.close()
+        if isinstance(self.tt, SharedTranspositionTable):
+            self.tt.close()
+            self.tt = None
+
+    def _new_search(self, state=None):
+        """
+        Resets the per-search state (node counter, transposition table generation)
+        and synchronizes the incremental evaluator with the root state.
+        """
+        self.nodes = 0
+        self.qnodes = 0
+        if self.stats is not None:
+            self.stats.reset()
+        self.null_window_searches = 0
+        self.researches = 0
+        self.mtdf_passes = 0
+        self.aspiration_searches = 0
+        self.aspiration_fail_lows = 0
+        self.aspiration_fail_highs = 0
+        self.null_move_searches = 0
+        self.null_move_cutoffs = 0
+        self.lmr_reductions = 0
+        self.lmr_researches = 0
+        self.futility_prunes = 0
+        self.reverse_futility_prunes = 0
+        self.razor_prunes = 0
+        self.extensions = 0
+        self.mate_distance_prunes = 0
+        self.seldepth = 0
+        self.completed_depth = 0
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.move_orderer is not None:
+            self.move_orderer.new_search()
+        if self.evaluator is not None and state is not None:
+            self.evaluator.reset(state)
+
+    def _visit(self):
+        """
+        Counts a node and periodically checks the stop event and the time and node budgets.
+        """
+        self.nodes += 1
+        if not self.nodes & LIMITS_CHECK_MASK:
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchTimeout()
+            if self._deadline is not None and (time.perf_counter() >= self._deadline
+                                               or (self._max_nodes is not None and self.nodes >= self._max_nodes)):
+                raise SearchTimeout()
+
+    def _evaluate(self, state, maximizing_player, ply=None):
+        """
+        Static evaluation of a node from the point of view of the maximizing (root) player.
+        H0 is relative to the side to move, which is the root player at maximizing nodes.
+        With an incremental evaluator, which does not recognize terminal states, the search checks them here.
+        When the distance from the root `ply` is given, infinite (mate) values become mate scores.
+        """
+        if self.evaluator is not None and self.is_final(state):
+            value = self.final_H0(state)
+        else:
+            value = self.H_0(state)
+        if ply is not None:
+            value = self._mate_score(value, ply)
+        return value if maximizing_player else -value
+
+    def _mate_score(self, value, ply):
+        """
+        Converts an infinite value of H0 (the side to move is mated, or mates) at distance `ply`
+        from the root into a finite mate score; other values are returned unchanged.
+        """
+        if value == float('-inf'):
+            return -(MATE_SCORE - ply)
+        if value == float('inf'):
+            return MATE_SCORE - ply
+        return value
+
+    def _mate_distance_pruning(self, alpha, beta, maximizing_player, ply):
+        """
+        Mate-distance pruning: at `ply` the value cannot be better than mating with the next move,
+        nor worse than being mated now. If the window lies outside these limits, a shorter mate
+        has already been found elsewhere and the node returns the limit (otherwise None).
+        """
+        if maximizing_player:
+            lowest, highest = -(MATE_SCORE - ply), MATE_SCORE - ply - 1
+        else:
+            lowest, highest = -(MATE_SCORE - ply - 1), MATE_SCORE - ply
+        if lowest >= beta:
+            return lowest
+        if highest <= alpha:
+            return highest
+        return None
+
+    def _extension(self, child, ply):
+        """
+        Check extension: a move that gives check is searched one ply deeper, as long as the node
+        is closer to the root than twice the root depth.
+        """
+        if self.check_extensions and ply < 2 * self._root_depth and child.is_check():
+            self.extensions += 1
+            return 1
+        return 0
+
+    def _restore(self, state, root_ply):
+        """
+        Takes back the moves left on the board by an interrupted make/unmake search.
+        """
+        if root_ply is None:
+            return
+        while len(state.move_stack) > root_ply:
+            self.unmake_move(state, state.peek())
+
+    def _move_of(self, move):
+        """
+        Returns the `chess.Move` behind a move of the search (the last move of a successor state
+        when the agent is built from get_children_function).
+        """
+        return move if self.move_mode else move.peek()
+
+    def _tt_probe(self, key, L, alpha, beta, maximizing_player, ply=0):
+        """
+        Probes the transposition table for the current node.
+        Returns the stored value if it allows a cutoff (None otherwise) and the stored best move.
+        """
+        entry = self.tt.probe(key)
+        if entry is None:
+            return None, None
+        depth, flag, score, move = entry
+        # I punteggi di matto sono salvati come distanza dal nodo, non dalla radice
+        if score >= MATE_THRESHOLD:
+            score -= ply
+        elif score <= -MATE_THRESHOLD:
+            score += ply
+        # Le entry sono salvate dal punto di vista del giocatore di turno
+        if not maximizing_player:
+            score = -score
+            flag = flip_bound(flag)
+        if depth >= L:
+            if flag == EXACT or (flag == LOWERBOUND and score >= beta) or (flag == UPPERBOUND and score <= alpha):
+                return score, move
+        return None, move
+
+    def _tt_store(self, key, L, value, alpha, beta, maximizing_player, best_move, ply=0):
+        """
+        Stores the value of a node searched with the (alpha, beta) window.
+        """
+        # Il valore di una radice cercata senza alcune mosse non è quello della posizione
+        if ply == 0 and self._excluded_root_moves:
+            return
+        if value <= alpha:
+            flag = UPPERBOUND
+        elif value >= beta:
+            flag = LOWERBOUND
+        else:
+            flag = EXACT
+        if not maximizing_player:
+            value = -value
+            flag = flip_bound(flag)
+        if value >= MATE_THRESHOLD:
+            value += ply
+        elif value <= -MATE_THRESHOLD:
+            value -= ply
+        if best_move is not None:
+            best_move = self._move_of(best_move)
+        self.tt.store(key, L, flag, value, best_move)
+
+    def _order_moves(self, state, moves, ply, hash_move):
+        """
+        Orders the moves of a node with the move orderer, or just puts the hash move first.
+        """
+        if self.move_orderer is not None:
+            return self.move_orderer.order(state, moves, ply, hash_move, None if self.move_mode else self._move_of)
+        if hash_move is not None:
+            return self._hash_move_first(moves, hash_move)
+        return moves
+
+    def _record_cutoff(self, state, move, ply, L, index):
+        """
+        Notifies the move orderer that `move` caused a cutoff at this node.
+        """
+        if self.move_orderer is not None:
+            self.move_orderer.record_cutoff(state, self._move_of(move), ply, L, index)
+
+    def _null_move_cutoff(self, state, L, alpha, beta, maximizing_player, ply, search):
+        """
+        Null-move pruning: the side to move passes and the opponent's reply is searched with a
+        zero window at reduced depth (R = 2, or 3 for deep nodes) by `search`. If even passing
+        reaches the bound the node is pruned.
+        Returns the value to return from the node, or None if it must be searched.
+        """
+        if not self.null_move or ply == 0 or L < 3 or not self._null_move_allowed(state):
+            bound = None
+        else:
+            bound = beta if maximizing_player else alpha
+        if bound is None or abs(bound) == float('inf'):
+            return None
+
+        reduction = 3 if L > 6 else 2
+        self.null_move_searches += 1
+        null = chess.Move.null()
+        if self.move_mode:
+            child = self.make_move(state, null)
+        else:
+            child = state.copy()
+            child.push(null)
+        if maximizing_player:
+            value, _ = search(child, L - 1 - reduction, beta - 1, beta, False, ply + 1)
+            cutoff = value >= beta
+        else:
+            value, _ = search(child, L - 1 - reduction, alpha, alpha + 1, True, ply + 1)
+            cutoff = value <= alpha
+        if self.move_mode:
+            self.unmake_move(state, null)
+
+        if not cutoff:
+            return None
+        self.null_move_cutoffs += 1
+        # Un matto trovato passando la mossa non è dimostrato: si restituisce solo il bound
+        return bound if is_mate_score(value) else value
+
+    def _static_pruning(self, state, L, alpha, beta, maximizing_player, ply, search):
+        """
+        Pruning near the leaves based on the static evaluation of the node (not at the root,
+        not in check, not with mate bounds, only at the depths that have a margin):
+
+        - reverse futility: if the evaluation beats the bound by the futility margin the
+          opponent is not expected to recover, and the node returns the evaluation minus the margin;
+        - razoring: if the evaluation is below the other bound by the razoring margin, the fail is
+          checked with the quiescence search at depth 1 and, deeper, with a zero-window search one
+          ply shallower (by `search`), since the quiescence search does not see quiet checks and
+          mates; the node returns the value if it confirms the fail;
+        - futility: if the evaluation plus the futility margin cannot reach the bound, the quiet
+          moves that do not give check are skipped (except the first one).
+
+        Returns the value to return from the node (or None) and, when futility pruning applies,
+        the bound assumed for the skipped moves (or None).
+        """
+        futility = self.futility_margins[L - 1] if L <= len(self.futility_margins) else None
+        razoring = self.razoring_margins[L - 1] if L <= len(self.razoring_margins) else None
+        if (ply == 0 or (futility is None and razoring is None) or is_mate_score(alpha) or is_mate_score(beta)
+                or state.is_check()):
+            return None, None
+
+        static = self._evaluate(state, maximizing_player)
+        # Dal punto di vista del giocatore del nodo: `good` è il bound da superare, `bad` quello da non mancare
+        sign = 1 if maximizing_player else -1
+        good, bad = (beta, alpha) if maximizing_player else (alpha, beta)
+        if futility is not None and abs(good) != float('inf') and sign * (static - sign * futility - good) >= 0:
+            self.reverse_futility_prunes += 1
+            return static - sign * futility, None
+
+        if razoring is not None and abs(bad) != float('inf') and sign * (static + sign * razoring - bad) <= 0:
+            if L == 1:
+                value = self._horizon(state, alpha, beta, maximizing_player, ply)
+            elif maximizing_player:
+                value, _ = search(state, L - 1, alpha, alpha + 1, True, ply)
+            else:
+                value, _ = search(state, L - 1, beta - 1, beta, False, ply)
+            if sign * (value - bad) <= 0:
+                self.razor_prunes += 1
+                return value, None
+
+        if futility is not None and abs(bad) != float('inf') and sign * (static + sign * futility - bad) <= 0:
+            return None, static + sign * futility
+        return None, None
+
+    def pruning_stats(self):
+        """
+        Returns the counters of the last search's pruning techniques as a dictionary.
+        """
+        return {
+            "nodes": self.nodes,
+            "qnodes": self.qnodes,
+            "null_move_cutoffs": self.null_move_cutoffs,
+            "lmr_reductions": self.lmr_reductions,
+            "futility_prunes": self.futility_prunes,
+            "reverse_futility_prunes": self.reverse_futility_prunes,
+            "razor_prunes": self.razor_prunes,
+        }
+
+    def _null_move_allowed(self, state):
+        """
+        Null-move pruning is unsafe when in check, right after another null move, and in
+        pawn-only endgames of the side to move, where zugzwang is common.
+        """
+        if state.move_stack and not state.move_stack[-1]:
+            return False
+        if not state.occupied_co[state.turn] & ~(state.pawns | state.kings):
+            return False
+        return not state.is_check()
+
+    def _hash_move_first(self, moves, hash_move):
+        """
+        Moves `hash_move` to the front of the list.
+        """
+        for i, move in enumerate(moves):
+            if self._move_of(move) == hash_move:
+                if i:
+                    moves.insert(0, moves.pop(i))
+                break
+        return moves
 
     def minmax(self, state, L, maximizing_player=True):
         """
         Standard Minimax algorithm without pruning.
         """
+        self._visit()
         if L == 0 or self.is_final(state):
-            return self.H_0(state), state
+            return self._evaluate(state, maximizing_player), None
 
-        children = self.get_children(state)
-        if not children:
-            return self.H_0(state), state
+        moves = self.get_moves(state)
+        if not moves:
+            return self._evaluate(state, maximizing_player), None
 
         best_value = float('-inf') if maximizing_player else float('inf')
-        best_children_states = [] 
+        best_moves = [] 
 
-        for child in children:
+        for move in moves:
+            child = self.make_move(state, move)
             # Qui si passa `not maximizing_player` perché si sta passando al turno dell'avversario
             # per la prossima ricorsione. La H0 normalizzerà di nuovo.
             child_value, _ = self.minmax(child, L - 1, not maximizing_player)
+            self.unmake_move(state, move)
 
             if maximizing_player:
                 if child_value > best_value:
                     best_value = child_value
-                    best_children_states = [child]
+                    best_moves = [move]
                 elif child_value == best_value:
-                    best_children_states.append(child)
+                    best_moves.append(move)
             else: # Minimizing player
                 if child_value < best_value:
                     best_value = child_value
-                    best_children_states = [child]
+                    best_moves = [move]
                 elif child_value == best_value:
-                    best_children_states.append(child)
+                    best_moves.append(move)
 
-        best_child_state = random.choice(best_children_states) if best_children_states else None
-        return best_value, best_child_state
+        best_move = random.choice(best_moves) if best_moves else None
+        return best_value, best_move
 
-    def fhabminmax(self, state, L, alpha=float('-inf'), beta=float('inf'), maximizing_player=True):
+    def fhabminmax(self, state, L, alpha=float('-inf'), beta=float('inf'), maximizing_player=True, ply=0):
         """
         Fail-Hard Alpha-Beta Pruning Minimax.
         """
-        if L == 0 or self.is_final(state):
-            return self.H_0(state), state
+        self._visit()
+        self._pv_length[ply] = ply
+        if ply > self.seldepth:
+            self.seldepth = ply
+        if ply == 0:
+            self._root_depth = L
+        if L == 0:
+            return self._horizon(state, alpha, beta, maximizing_player, ply), None
+        if self.is_final(state):
+            return self._evaluate(state, maximizing_player, ply), None
+        if ply > 0:
+            mate_value = self._mate_distance_pruning(alpha, beta, maximizing_player, ply)
+            if mate_value is not None:
+                self.mate_distance_prunes += 1
+                return mate_value, None
+
+        key = hash_move = None
+        if self.tt is not None:
+            key = self.hash(state)
+            tt_value, hash_move = self._tt_probe(key, L, alpha, beta, maximizing_player, ply)
+            # Alla radice serve comunque una mossa, quindi non si esce dalla tabella
+            if tt_value is not None and ply > 0:
+                return tt_value, None
 
-        children = self.get_children(state)
-        if not children:
-            return self.H_0(state), state
+        if self._null_move_cutoff(state, L, alpha, beta, maximizing_player, ply, self.fhabminmax) is not None:
+            return (beta if maximizing_player else alpha), None
 
-        best_move_state = None
+        pruned_value, futility_value = self._static_pruning(state, L, alpha, beta, maximizing_player, ply,
+                                                            self.fhabminmax)
+        if pruned_value is not None:
+            return pruned_value, None
+
+        moves = self.get_moves(state)
+        if ply == 0 and self._excluded_root_moves:
+            moves = self._exclude_root_moves(moves)
+        if not moves:
+            return self._evaluate(state, maximizing_player, ply), None
+        if ply == 0 and self._root_hint is not None:
+            hash_move = self._root_hint
+        moves = self._order_moves(state, moves, ply, hash_move)
+
+        alpha_orig, beta_orig = alpha, beta
+        best_move = None
 
         if maximizing_player:
             value = float('-inf')
-            for child in children:
-                child_value, _ = self.fhabminmax(child, L - 1, alpha, beta, False)
+            for index, move in enumerate(moves):
+                futile = futility_value is not None and index > 0 and not is_noisy(state, self._move_of(move))
+                child = self.make_move(state, move)
+                if futile and not child.is_check():
+                    # Mossa tranquilla che non può portare il valore sopra alpha
+                    self.unmake_move(state, move)
+                    self.futility_prunes += 1
+                    value = max(value, futility_value)
+                    continue
+                child_value, _ = self.fhabminmax(child, L - 1 + self._extension(child, ply), alpha, beta, False, ply + 1)
+                self.unmake_move(state, move)
                 if child_value > value:
                     value = child_value
-                    best_move_state = child 
+                    best_move = move
+                    self._update_pv(ply, move)
                 alpha = max(alpha, value)
                 if alpha >= beta:
+                    self._record_cutoff(state, move, ply, L, index)
                     break 
-            return value, best_move_state
         else: # Minimizing player
             value = float('inf')
-            for child in children:
-                child_value, _ = self.fhabminmax(child, L - 1, alpha, beta, True)
+            for index, move in enumerate(moves):
+                futile = futility_value is not None and index > 0 and not is_noisy(state, self._move_of(move))
+                child = self.make_move(state, move)
+                if futile and not child.is_check():
+                    self.unmake_move(state, move)
+                    self.futility_prunes += 1
+                    value = min(value, futility_value)
+                    continue
+                child_value, _ = self.fhabminmax(child, L - 1 + self._extension(child, ply), alpha, beta, True, ply + 1)
+                self.unmake_move(state, move)
                 if child_value < value:
                     value = child_value
-                    best_move_state = child 
+                    best_move = move
+                    self._update_pv(ply, move)
                 beta = min(beta, value)
                 if beta <= alpha:
+                    self._record_cutoff(state, move, ply, L, index)
                     break 
-            return value, best_move_state
 
-    def fsabminmax(self, state, L, alpha=float('-inf'), beta=float('inf'), maximizing_player=True):
+        if key is not None:
+            self._tt_store(key, L, value, alpha_orig, beta_orig, maximizing_player, best_move, ply)
+        return value, best_move
+
+    def fsabminmax(self, state, L, alpha=float('-inf'), beta=float('inf'), maximizing_player=True, ply=0):
         """
         Fail-Soft Alpha-Beta Pruning Minimax.
         """
-        if L == 0 or self.is_final(state):
-            return self.H_0(state), state
+        self._visit()
+        self._pv_length[ply] = ply
+        if ply > self.seldepth:
+            self.seldepth = ply
+        if ply == 0:
+            self._root_depth = L
+        if L == 0:
+            return self._horizon(state, alpha, beta, maximizing_player, ply), None
+        if self.is_final(state):
+            return self._evaluate(state, maximizing_player, ply), None
+        if ply > 0:
+            mate_value = self._mate_distance_pruning(alpha, beta, maximizing_player, ply)
+            if mate_value is not None:
+                self.mate_distance_prunes += 1
+                return mate_value, None
+
+        key = hash_move = None
+        if self.tt is not None:
+            key = self.hash(state)
+            tt_value, hash_move = self._tt_probe(key, L, alpha, beta, maximizing_player, ply)
+            if tt_value is not None and ply > 0:
+                return tt_value, None
+
+        null_value = self._null_move_cutoff(state, L, alpha, beta, maximizing_player, ply, self.fsabminmax)
+        if null_value is not None:
+            return null_value, None
+
+        pruned_value, futility_value = self._static_pruning(state, L, alpha, beta, maximizing_player, ply,
+                                                            self.fsabminmax)
+        if pruned_value is not None:
+            return pruned_value, None
 
-        children = self.get_children(state)
-        if not children:
-            return self.H_0(state), state
+        moves = self.get_moves(state)
+        if ply == 0 and self._excluded_root_moves:
+            moves = self._exclude_root_moves(moves)
+        if not moves:
+            return self._evaluate(state, maximizing_player, ply), None
+        if ply == 0 and self._root_hint is not None:
+            hash_move = self._root_hint
+        moves = self._order_moves(state, moves, ply, hash_move)
 
-        best_move_state = None
+        alpha_orig, beta_orig = alpha, beta
+        best_move = None
+        in_check = self.late_move_reductions and L >= 3 and state.is_check()
 
         if maximizing_player:
             value = float('-inf')
-            for child in children:
-                child_value, _ = self.fsabminmax(child, L - 1, alpha, beta, False)
+            for index, move in enumerate(moves):
+                futile = futility_value is not None and index > 0 and not is_noisy(state, self._move_of(move))
+                reduction = self._late_move_reduction(state, move, L, index, in_check, ply)
+                child = self.make_move(state, move)
+                if futile and not child.is_check():
+                    # Mossa tranquilla che non può portare il valore sopra alpha
+                    self.unmake_move(state, move)
+                    self.futility_prunes += 1
+                    value = max(value, futility_value)
+                    continue
+                child_value = self._fs_child(child, L - 1 + self._extension(child, ply), alpha, beta, True, ply, reduction)
+                self.unmake_move(state, move)
                 if child_value > value:
                     value = child_value
-                    best_move_state = child
+                    best_move = move
+                    self._update_pv(ply, move)
                 if value >= beta: 
-                    return value, best_move_state 
+                    self._record_cutoff(state, move, ply, L, index)
+                    break 
                 alpha = max(alpha, value)
-            return value, best_move_state
         else: # Minimizing player
             value = float('inf')
-            for child in children:
-                child_value, _ = self.fsabminmax(child, L - 1, alpha, beta, True)
+            for index, move in enumerate(moves):
+                futile = futility_value is not None and index > 0 and not is_noisy(state, self._move_of(move))
+                reduction = self._late_move_reduction(state, move, L, index, in_check, ply)
+                child = self.make_move(state, move)
+                if futile and not child.is_check():
+                    self.unmake_move(state, move)
+                    self.futility_prunes += 1
+                    value = min(value, futility_value)
+                    continue
+                child_value = self._fs_child(child, L - 1 + self._extension(child, ply), alpha, beta, False, ply, reduction)
+                self.unmake_move(state, move)
                 if child_value < value:
                     value = child_value
-                    best_move_state = child
+                    best_move = move
+                    self._update_pv(ply, move)
                 if value <= alpha: 
-                    return value, best_move_state 
+                    self._record_cutoff(state, move, ply, L, index)
+                    break 
                 beta = min(beta, value)
-            return value, best_move_state
 
-    def blminmax(self, state, L, branch_limit: int = 5, maximizing_player=True):
+        if key is not None:
+            self._tt_store(key, L, value, alpha_orig, beta_orig, maximizing_player, best_move, ply)
+        return value, best_move
+
+    def _late_move_reduction(self, state, move, L, index, in_check, ply):
+        """
+        Depth reduction of a move of the fail-soft engine: late quiet moves of nodes that are not
+        in check are reduced according to `LMR_TABLE` (0 means no reduction). The root moves are
+        always searched at full depth, as the root-parallel search does.
+        Must be called before the move is made.
+        """
+        if not self.late_move_reductions or ply == 0 or L < 3 or index < LMR_MIN_MOVES or in_check:
+            return 0
+        if is_noisy(state, self._move_of(move)):
+            return 0
+        return min(LMR_TABLE[min(L, 63)][min(index, 63)], L - 2)
+
+    def _fs_child(self, child, depth, alpha, beta, maximizing_player, ply, reduction):
+        """
+        Searches a child of a fail-soft node to `depth`. A reduced move (that does not give check)
+        is first searched at reduced depth with a zero window, and searched again at full depth
+        only if it beats the bound.
+        """
+        if reduction and not child.is_check():
+            bound = alpha if maximizing_player else beta
+            if abs(bound) != float('inf'):
+                self.lmr_reductions += 1
+                if maximizing_player:
+                    child_value, _ = self.fsabminmax(child, depth - reduction, alpha, alpha + 1, False, ply + 1)
+                    fails = child_value <= alpha
+                else:
+                    child_value, _ = self.fsabminmax(child, depth - reduction, beta - 1, beta, True, ply + 1)
+                    fails = child_value >= beta
+                if fails:
+                    return child_value
+                self.lmr_researches += 1
+        child_value, _ = self.fsabminmax(child, depth, alpha, beta, not maximizing_player, ply + 1)
+        return child_value
+
+    def pvs(self, state, L, alpha=float('-inf'), beta=float('inf'), maximizing_player=True, ply=0):
+        """
+        Principal Variation Search (NegaScout).
+        The first move of every node is searched with the full window, the others with a zero
+        window around alpha, and searched again with the full window only when they fail high.
+        The search is negamax-formulated (see `_pvs`); this wrapper converts its values to the
+        point of view of the maximizing player. Zero windows assume integer evaluations.
+        """
+        if maximizing_player:
+            return self._pvs(state, L, alpha, beta, ply)
+        value, best_move = self._pvs(state, L, -beta, -alpha, ply)
+        return -value, best_move
+
+    def _pvs(self, state, L, alpha, beta, ply):
+        """
+        Negamax core of `pvs`: values are relative to the side to move in `state`.
+        """
+        self._visit()
+        self._pv_length[ply] = ply
+        if ply > self.seldepth:
+            self.seldepth = ply
+        if ply == 0:
+            self._root_depth = L
+        if L == 0:
+            return self._horizon(state, alpha, beta, True, ply), None
+        if self.is_final(state):
+            return self._evaluate(state, True, ply), None
+        if ply > 0:
+            mate_value = self._mate_distance_pruning(alpha, beta, True, ply)
+            if mate_value is not None:
+                self.mate_distance_prunes += 1
+                return mate_value, None
+
+        key = hash_move = None
+        if self.tt is not None:
+            key = self.hash(state)
+            tt_value, hash_move = self._tt_probe(key, L, alpha, beta, True, ply)
+            if tt_value is not None and ply > 0:
+                return tt_value, None
+
+        null_value = self._null_move_cutoff(state, L, alpha, beta, True, ply, self.pvs)
+        if null_value is not None:
+            return null_value, None
+
+        moves = self.get_moves(state)
+        if ply == 0 and self._excluded_root_moves:
+            moves = self._exclude_root_moves(moves)
+        if not moves:
+            return self._evaluate(state, True, ply), None
+        if ply == 0 and self._root_hint is not None:
+            hash_move = self._root_hint
+        moves = self._order_moves(state, moves, ply, hash_move)
+
+        alpha_orig = alpha
+        value = float('-inf')
+        best_move = None
+        for index, move in enumerate(moves):
+            child = self.make_move(state, move)
+            depth = L - 1 + self._extension(child, ply)
+            if index == 0 or alpha == float('-inf'):
+                score = -self._pvs(child, depth, -beta, -alpha, ply + 1)[0]
+            else:
+                # Finestra nulla: basta dimostrare che la mossa non supera alpha
+                self.null_window_searches += 1
+                score = -self._pvs(child, depth, -alpha - 1, -alpha, ply + 1)[0]
+                if alpha < score < beta:
+                    self.researches += 1
+                    score = -self._pvs(child, depth, -beta, -alpha, ply + 1)[0]
+            self.unmake_move(state, move)
+            if score > value:
+                value = score
+                best_move = move
+                self._update_pv(ply, move)
+            if value >= beta:
+                self._record_cutoff(state, move, ply, L, index)
+                break
+            alpha = max(alpha, value)
+
+        if key is not None:
+            self._tt_store(key, L, value, alpha_orig, beta, True, best_move, ply)
+        return value, best_move
+
+    def pvs_stats(self):
+        """
+        Returns the zero-window search counters of the last PVS search as a dictionary.
+        """
+        return {
+            "null_window_searches": self.null_window_searches,
+            "researches": self.researches,
+            "research_rate": self.researches / self.null_window_searches if self.null_window_searches else 0.0,
+        }
+
+    def mtdf(self, state, L, maximizing_player=True, ply=0):
+        """
+        MTD(f): converges on the minimax value with a sequence of zero-window fail-soft alpha-beta
+        searches (`fsabminmax`), each one narrowing the bounds around the value. The searches
+        revisit the same tree, so they rely on the transposition table to remember the bounds
+        found by the previous passes. Zero windows assume integer evaluations.
+        """
+        guess = self._first_guess(state, maximizing_player)
+        lower, upper = float('-inf'), float('inf')
+        best_move = None
+        while lower < upper:
+            beta = guess + 1 if guess == lower else guess
+            self.mtdf_passes += 1
+            guess, move = self.fsabminmax(state, L, beta - 1, beta, maximizing_player, ply)
+            if guess < beta:
+                upper = guess
+            else:
+                lower = guess
+                best_move = move
+            # Se tutte le mosse falliscono in basso si tiene comunque una mossa
+            if best_move is None:
+                best_move = move
+
+        if ply == 0:
+            self._remember_score(state, guess)
+        return guess, best_move
+
+    def _remember_score(self, root, value):
+        """
+        Stores the score of a root search, used as first guess / window centre by the next ones.
+        """
+        self._previous_score = value
+        self._previous_root = self.hash(root)
+
+    def _previous_score_at(self, state):
+        """
+        The score of the previous root search if its root was `state` or one of its last two
+        ancestors on the same game line (negated when the side to move differs); None otherwise,
+        so the score of an unrelated position is never reused.
+        """
+        if self._previous_score is None:
+            return None
+        if self.hash(state) == self._previous_root:
+            return self._previous_score
+        if not getattr(state, "move_stack", None):
+            return None
+        board = state.copy()
+        for plies in (1, 2):
+            if not board.move_stack:
+                break
+            board.pop()
+            if self.hash(board) == self._previous_root:
+                return -self._previous_score if plies == 1 else self._previous_score
+        return None
+
+    def _first_guess(self, state, maximizing_player):
+        """
+        Returns the first guess of MTD(f) for the root `state` (always a finite value).
+        """
+        previous = self._previous_score_at(state) if self.first_guess == "previous" else None
+        if callable(self.first_guess):
+            guess = self.first_guess(state)
+        elif previous is not None:
+            guess = previous
+        else:
+            guess = self._evaluate(state, maximizing_player)
+        return guess if not is_mate_score(guess) else 0
+
+    def aspiration_search(self, state, L, alpha=float('-inf'), beta=float('inf'), maximizing_player=True, ply=0):
+        """
+        Fail-soft alpha-beta whose root searches use aspiration windows: the search starts with a
+        narrow window around the previous score (of the previous iteration or of the previous
+        moves of the same game, see `_previous_score_at`, or else of a pre-search two plies
+        shallower) and is repeated with a wider window on the failing side until the value falls
+        inside it. Other calls go straight to `fsabminmax`.
+        """
+        if ply > 0 or alpha != float('-inf') or beta != float('inf'):
+            return self.fsabminmax(state, L, alpha, beta, maximizing_player, ply)
+
+        center = self._previous_score_at(state)
+        if center is None and L > 2:
+            center, _ = self.fsabminmax(state, L - 2, maximizing_player=maximizing_player)
+        if center is None or is_mate_score(center):
+            value, best_move = self.fsabminmax(state, L, maximizing_player=maximizing_player)
+            self._remember_score(state, value)
+            return value, best_move
+
+        widths = self.aspiration_widths
+        low = high = 0
+        while True:
+            alpha = center - widths[low] if low < len(widths) else float('-inf')
+            beta = center + widths[high] if high < len(widths) else float('inf')
+            self.aspiration_searches += 1
+            value, best_move = self.fsabminmax(state, L, alpha, beta, maximizing_player)
+            if value <= alpha and alpha != float('-inf'):
+                self.aspiration_fail_lows += 1
+                low += 1
+            elif value >= beta and beta != float('inf'):
+                self.aspiration_fail_highs += 1
+                high += 1
+            else:
+                break
+
+        self._remember_score(state, value)
+        return value, best_move
+
+    def aspiration_stats(self):
+        """
+        Returns the aspiration window counters of the last search as a dictionary.
+        """
+        researches = self.aspiration_fail_lows + self.aspiration_fail_highs
+        return {
+            "searches": self.aspiration_searches,
+            "fail_lows": self.aspiration_fail_lows,
+            "fail_highs": self.aspiration_fail_highs,
+            "research_rate": researches / self.aspiration_searches if self.aspiration_searches else 0.0,
+        }
+
+    def quiescence(self, state, alpha, beta, depth, ply=0):
+        """
+        Quiescence search: explores only captures and promotions (every move when in check),
+        with a stand-pat cutoff on the static evaluation.
+        Values are relative to the side to move (negamax).
+        """
+        self._visit()
+        self.qnodes += 1
+        if ply > self.seldepth:
+            self.seldepth = ply
+        stand_pat = self._mate_score(self.H_0(state), ply)
+        if depth <= 0:
+            return stand_pat
+
+        in_check = state.is_check()
+        if in_check:
+            # Sotto scacco non si può "stare fermi": si cercano tutte le risposte
+            best_value = float('-inf')
+            moves = self.get_moves(state)
+            if not moves:
+                return self._mate_score(self.final_H0(state), ply)
+        else:
+            if stand_pat >= beta:
+                return stand_pat
+            best_value = stand_pat
+            alpha = max(alpha, stand_pat)
+            moves = self._noisy_moves(state)
+
+        for move in moves:
+            child = self.make_move(state, move)
+            value = -self.quiescence(child, -beta, -alpha, depth - 1, ply + 1)
+            self.unmake_move(state, move)
+            if value > best_value:
+                best_value = value
+                if value > alpha:
+                    alpha = value
+                if value >= beta:
+                    break
+        return best_value
+
+    def _generate_noisy(self, state):
+        """
+        Generates the captures and promotions of `state`: the move generation of the quiescence search.
+        """
+        return [move for move in state.legal_moves if move.promotion or state.is_capture(move)]
+
+    def _noisy_moves(self, state):
+        """
+        Returns the captures and promotions of `state` as moves of the search.
+        """
+        noisy = self._generate_noisy(state)
+        noisy.sort(key=lambda move: mvv_lva(state, move), reverse=True)
+        if self.move_mode:
+            return noisy
+        children = []
+        for move in noisy:
+            child = state.copy()
+            child.push(move)
+            children.append(child)
+        return children
+
+    def _horizon(self, state, alpha, beta, maximizing_player, ply):
+        """
+        Value of a horizon node of the alpha-beta engines from the root player's point of view:
+        the quiescence search result, or the static evaluation if quiescence is disabled.
+        """
+        if self.quiescence_depth <= 0:
+            return self._evaluate(state, maximizing_player, ply)
+        if maximizing_player:
+            return self.quiescence(state, alpha, beta, self.quiescence_depth, ply)
+        return -self.quiescence(state, -beta, -alpha, self.quiescence_depth, ply)
+
+    def blminmax(self, state, L, branch_limit: int = 5, maximizing_player=True, rank_children=None):
         """
         Branch-Limited Minimax (blMinMax).
-        Explores only the 'branch_limit' most promising states based on H0 evaluation.
+        Explores only the 'branch_limit' most promising states based on H0 evaluation
+        (or on the values returned by `rank_children`, if given).
         """
+        self._visit()
         if L == 0 or self.is_final(state):
-            return self.H_0(state), state
+            return self._evaluate(state, maximizing_player), None
 
-        all_children = self.get_children(state)
-        if not all_children:
-            return self.H_0(state), state
+        all_moves = self.get_moves(state)
+        if not all_moves:
+            return self._evaluate(state, maximizing_player), None
 
-        evaluated_children = []
-        for child in all_children:
-            # Valuta i figli dalla prospettiva del giocatore attuale
-            h0_val = self.H_0(child) 
-            evaluated_children.append((h0_val, child))
+        evaluated_children = (rank_children or self._rank_children)(state, all_moves)
 
         # Ordina i figli in base al valore H0.
         # Se siamo il giocatore massimizzante (cercando il valore più alto di H0), ordina in modo decrescente.
@@ -261,48 +1506,125 @@ class MinMaxAgent:
         evaluated_children.sort(key=lambda x: x[0], reverse=True) # Sempre decrescente per selezionare i migliori figli
 
         # Seleziona solo i primi 'branch_limit' figli più promettenti
-        promising_children = [child_tuple[1] for child_tuple in evaluated_children[:branch_limit]]
+        promising_moves = [child_tuple[1] for child_tuple in evaluated_children[:branch_limit]]
 
         best_value = float('-inf') if maximizing_player else float('inf')
         best_children_for_move = []
 
-        for child in promising_children:
+        for move in promising_moves:
+            child = self.make_move(state, move)
             # Passa `not maximizing_player` per la ricorsione. La H0 sarà normalizzata per l'avversario.
-            child_value, _ = self.blminmax(child, L - 1, branch_limit, not maximizing_player)
+            child_value, _ = self.blminmax(child, L - 1, branch_limit, not maximizing_player, rank_children)
+            self.unmake_move(state, move)
 
             if maximizing_player:
                 if child_value > best_value:
                     best_value = child_value
-                    best_children_for_move = [child]
+                    best_children_for_move = [move]
                 elif child_value == best_value:
-                    best_children_for_move.append(child)
+                    best_children_for_move.append(move)
             else: # Minimizing player
                 if child_value < best_value:
                     best_value = child_value
-                    best_children_for_move = [child]
+                    best_children_for_move = [move]
                 elif child_value == best_value:
-                    best_children_for_move.append(child)
+                    best_children_for_move.append(move)
 
         best_child = random.choice(best_children_for_move) if best_children_for_move else None
         return best_value, best_child
 
+    def _rank_children(self, state, moves):
+        """
+        Scores every child with H0, from the point of view of the player to move in `state`.
+        Returns a list of (value, move) pairs.
+        """
+        evaluated_children = []
+        for move in moves:
+            child = self.make_move(state, move)
+            # Valuta i figli dalla prospettiva del giocatore attuale
+            # (H0 del figlio è dal punto di vista dell'avversario, quindi va negata)
+            h0_val = self._evaluate(child, False)
+            self.unmake_move(state, move)
+            evaluated_children.append((h0_val, move))
+        return evaluated_children
+
+    def _rank_children_batch(self, state, moves, evaluate_batch=None):
+        """
+        Like `_rank_children`, but the children are encoded as bitboards and scored
+        all together by `evaluate_batch` (the batch evaluation function by default).
+        In move mode the children are derived from the parent's bitboards without playing the moves.
+        """
+        encoded = encode_children(state, moves) if self.move_mode else encode_boards(moves)
+        _, mates = self._checks_and_mates(state, moves)
+        values = (-(evaluate_batch or self.H0_batch)(encoded)).tolist()
+        for i in mates:
+            values[i] = float('inf')
+        return list(zip(values, moves))
+
+    def _checks_and_mates(self, state, moves):
+        """
+        Finds the children that are in check and those that are checkmated, which the batch
+        evaluations do not recognize. In move mode only the moves that may give check are played.
+        Returns a boolean array of checks and the list of indices of the mates.
+        """
+        checks = np.zeros(len(moves), dtype=bool)
+        mates = []
+        if self.move_mode:
+            for i in checking_candidates(state, moves):
+                child = self.make_move(state, moves[i])
+                if child.is_check():
+                    checks[i] = True
+                    if child.is_checkmate():
+                        mates.append(i)
+                self.unmake_move(state, moves[i])
+        else:
+            for i, child in enumerate(moves):
+                if child.is_check():
+                    checks[i] = True
+                    if child.is_checkmate():
+                        mates.append(i)
+        return checks, mates
+
+    def batch_blminmax(self, state, L, branch_limit: int = 5, maximizing_player=True):
+        """
+        Branch-Limited Minimax whose children are ranked with one vectorized batch evaluation per node.
+        """
+        return self.blminmax(state, L, branch_limit, maximizing_player, self._rank_children_batch)
+
     def pred_blminmax(self, state, L, branch_limit: int = 5, maximizing_player=True):
         """
-        Placeholder for Pred-BLMinMax.
-        This would likely involve using a predictive model (e.g., a neural network)
-        to evaluate states or guide the branching.
+        Pred-BLMinMax: Branch-Limited Minimax whose children are ranked by the predictor network,
+        with one batched forward pass per node. Leaves are still evaluated with H0.
+        """
+        return self.blminmax(state, L, branch_limit, maximizing_player, self._rank_children_predicted)
+
+    def _rank_children_predicted(self, state, moves):
+        """
+        Scores the children with the predictor network (see `_rank_children_batch`).
         """
-        print("pred_blminmax not yet implemented. Falling back to blminmax.")
-        return self.blminmax(state, L, branch_limit, maximizing_player)
+        return self._rank_children_batch(state, moves, self.predictor)
 
     def mi_pred_blminmax(self, state, L, branch_limit: int = 5, maximizing_player=True):
         """
-        Placeholder for Multi-Input Pred-BLMinMax.
-        This would likely involve a predictive model that takes multiple inputs
-        (e.g., board state + features) to guide the branching.
+        Multi-Input Pred-BLMinMax: Branch-Limited Minimax whose children are ranked by the
+        multi-input network, which reads several feature blocks per move (piece planes, side to move,
+        castling rights, attack maps, capture/check/promotion) in one batched forward pass per node.
+        """
+        return self.blminmax(state, L, branch_limit, maximizing_player, self._rank_children_multi_input)
+
+    def _rank_children_multi_input(self, state, moves):
+        """
+        Scores the children with the multi-input network; the features of the parent position
+        are cached by its hash.
         """
-        print("mi_pred_blminmax not yet implemented. Falling back to blminmax.")
-        return self.blminmax(state, L, branch_limit, maximizing_player)
+        checks, mates = self._checks_and_mates(state, moves)
+        chess_moves = moves if self.move_mode else [child.peek() for child in moves]
+        features = self.feature_extractor.children(state, self.hash(state), chess_moves, checks)
+        # L'uscita della rete è già dal punto di vista del giocatore che muove
+        values = self.mi_predictor(features).tolist()
+        for i in mates:
+            values[i] = float('inf')
+        return list(zip(values, moves))
 
 # (Rimuovi il blocco `if __name__ == "__main__":` da questo file,
 # o lascialo solo per testare minmax_agent.py in isolamento.)
\ No newline at end of file
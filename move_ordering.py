@@ -0,0 +1,142 @@
+from operator import itemgetter
+import chess
+
+# Punteggi delle varie classi di mosse: la mossa della tabella di trasposizione viene
+# sempre per prima, poi catture e promozioni (MVV-LVA), le killer e infine le mosse
+# tranquille ordinate per history.
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 24
+KILLER_SCORE = 1 << 23
+HISTORY_MAX = 1 << 22
+
+_first = itemgetter(0)
+
+
+def is_noisy(board: chess.Board, move: chess.Move):
+    """
+    Verifica se la mossa è una cattura o una promozione.
+    """
+    return bool(move.promotion) or board.is_capture(move)
+
+
+def mvv_lva(board: chess.Board, move: chess.Move):
+    """
+    Punteggio Most Valuable Victim - Least Valuable Attacker di una cattura (o promozione):
+    prima la vittima di valore maggiore, a parità quella catturata dal pezzo di valore minore.
+    """
+    victim = board.piece_type_at(move.to_square)
+    if victim is None:
+        # Presa en passant (la casella di arrivo è vuota) o promozione senza cattura
+        victim = chess.PAWN if board.is_en_passant(move) else 0
+    score = victim * 8 - board.piece_type_at(move.from_square)
+    if move.promotion:
+        score += move.promotion * 8
+    return score
+
+
+class MoveOrderer:
+    """
+    Orders the moves of a node for the alpha-beta engines: hash move first, then captures
+    and promotions by MVV-LVA, then the killer moves of the current ply, then quiet moves
+    by their butterfly history score (side to move x from-square x to-square).
+
+    It also counts the beta cutoffs and how many of them were produced by the first move
+    searched, which measures the quality of the ordering.
+    """
+
+    def __init__(self, max_ply: int = 128, killer_slots: int = 2):
+        """
+        Initializes the killer and history tables.
+
+        Args:
+            max_ply (int): Number of plies with their own killer slots.
+            killer_slots (int): Number of killer moves kept per ply.
+        """
+        self.max_ply = max_ply
+        self.killer_slots = killer_slots
+        self.killers = [[] for _ in range(max_ply)]
+        self.history = [0] * (2 * 64 * 64)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Resets the cutoff counters.
+        """
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """
+        Prepares the tables for a new search: killers are cleared, history scores are aged.
+        """
+        self.killers = [[] for _ in range(self.max_ply)]
+        self.history = [score >> 1 for score in self.history]
+        self.reset_stats()
+
+    def order(self, board: chess.Board, moves, ply: int, hash_move=None, move_of=None):
+        """
+        Returns the moves sorted from the most to the least promising.
+
+        Args:
+            board (chess.Board): The position the moves are played from.
+            moves (list): The moves of the search.
+            ply (int): Distance from the root, used to look up the killer moves.
+            hash_move (chess.Move): The best move stored in the transposition table, if any.
+            move_of (callable): Maps a move of the search to its `chess.Move` (identity if None).
+        """
+        killers = self.killers[ply] if ply < self.max_ply else ()
+        history = self.history
+        side = int(board.turn) << 12
+        scored = []
+        for item in moves:
+            move = move_of(item) if move_of is not None else item
+            if move == hash_move:
+                score = HASH_MOVE_SCORE
+            elif move.promotion or board.is_capture(move):
+                score = CAPTURE_SCORE + mvv_lva(board, move)
+            elif move in killers:
+                score = KILLER_SCORE - killers.index(move)
+            else:
+                score = history[side | (move.from_square << 6) | move.to_square]
+            scored.append((score, item))
+        scored.sort(key=_first, reverse=True)
+        return [item for _, item in scored]
+
+    def record_cutoff(self, board: chess.Board, move: chess.Move, ply: int, depth: int, index: int):
+        """
+        Updates killers, history and statistics after `move` produced a beta cutoff.
+
+        Args:
+            board (chess.Board): The position the move was played from.
+            move (chess.Move): The move that caused the cutoff.
+            ply (int): Distance from the root.
+            depth (int): Remaining depth of the node.
+            index (int): Position of the move in the ordered list (0 = first move searched).
+        """
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if is_noisy(board, move):
+            return
+
+        if ply < self.max_ply:
+            killers = self.killers[ply]
+            if move in killers:
+                killers.remove(move)
+            killers.insert(0, move)
+            del killers[self.killer_slots:]
+
+        index = (int(board.turn) << 12) | (move.from_square << 6) | move.to_square
+        self.history[index] += depth * depth
+        if self.history[index] >= HISTORY_MAX:
+            self.history = [score >> 1 for score in self.history]
+
+    def stats(self):
+        """
+        Returns the ordering counters as a dictionary.
+        """
+        return {
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+        }
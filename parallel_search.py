@@ -0,0 +1,183 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+import chess
+
+# Intervallo (s) con cui il processo principale controlla l'evento di stop mentre attende i worker
+STOP_POLL_INTERVAL = 0.01
+
+# Stato dei processi worker, inizializzato una volta sola da `_init_worker`
+_worker_agent = None
+_shared_alpha = None
+_worker_search_id = None
+
+
+def _init_worker(agent_args, shared_alpha, stop_event):
+    """
+    Crea l'agente sequenziale usato dal processo worker, fermato dall'evento condiviso `stop_event`.
+    """
+    global _worker_agent, _shared_alpha
+    # Import locale: minmax_agent importa questo modulo
+    from minmax_agent import MinMaxAgent
+    _worker_agent = MinMaxAgent(**agent_args)
+    _worker_agent.stop_event = stop_event
+    _shared_alpha = shared_alpha
+
+
+def _search_root_move(fen, move_uci, depth, search_id, deadline, alpha=None, max_nodes=None):
+    """
+    Cerca una singola mossa della radice in un processo worker, entro `deadline` e al più `max_nodes` nodi.
+    Restituisce (valore, alpha usato, nodi, variazione dopo la mossa in UCI, seldepth dalla radice);
+    il valore è None se il tempo è scaduto o la ricerca è stata fermata.
+    """
+    global _worker_search_id
+    from minmax_agent import SearchTimeout
+
+    agent = _worker_agent
+    if search_id != _worker_search_id:
+        agent._new_search()
+        _worker_search_id = search_id
+    nodes_before = agent.nodes
+
+    if alpha is None:
+        alpha = _shared_alpha.value
+    board = chess.Board(fen)
+    move = chess.Move.from_uci(move_uci)
+    if agent.move_mode:
+        child = agent.make_move(board, move)
+    else:
+        board.push(move)
+        child = board
+
+    # Il budget di nodi viene controllato insieme alla scadenza, che deve quindi essere impostata
+    agent._deadline = deadline if deadline is not None or max_nodes is None else math.inf
+    agent._max_nodes = nodes_before + max_nodes if max_nodes is not None else None
+    # Le estensioni sono limitate in base alla profondità della radice, che il worker non cerca
+    agent._root_depth = depth
+    try:
+        value, _ = agent.engine(child, depth - 1, alpha, math.inf, False, 1)
+    except SearchTimeout:
+        return None, alpha, agent.nodes - nodes_before, [], agent.seldepth
+    finally:
+        agent._deadline = None
+        agent._max_nodes = None
+
+    # Condivide il nuovo bound con gli altri worker
+    with _shared_alpha.get_lock():
+        if value > _shared_alpha.value:
+            _shared_alpha.value = value
+    # La riga 1 della tabella triangolare contiene la variazione del figlio, a partire dalla colonna 1
+    pv = [move.uci() for move in agent._pv_table[1][1:agent._pv_length[1]]]
+    return value, alpha, agent.nodes - nodes_before, pv, agent.seldepth
+
+
+class RootParallelSearch:
+    """
+    Root-parallel alpha-beta: the root moves are searched in a pool of worker processes,
+    each one running the sequential engine on the position reached by its move.
+
+    Workers share the best root value found so far through a shared double, which they use
+    as alpha when starting a new root move. Values that fail low against that alpha are only
+    upper bounds, so moves that could tie with the best one are searched again with an open
+    window; this way the result is the same best move the sequential search would choose
+    (the first, in root order, among the moves with the highest value).
+
+    A search can be stopped through the event passed to `search`: the workers share an event
+    that interrupts them, and the moves not started yet are cancelled.
+
+    The pool is created on first use and reused across searches.
+    """
+
+    def __init__(self, agent_args: dict, workers: int):
+        """
+        Args:
+            agent_args (dict): Keyword arguments used to build the sequential agent of every worker.
+                Functions must be defined at module level so they can be pickled.
+            workers (int): Number of worker processes.
+        """
+        self.agent_args = agent_args
+        self.workers = workers
+        self._pool = None
+        self._alpha = None
+        self._stop = None
+        self._search_id = 0
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._alpha = multiprocessing.Value('d', -math.inf)
+            self._stop = multiprocessing.Event()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.agent_args, self._alpha, self._stop))
+        return self._pool
+
+    def _results(self, futures, stop_event):
+        """
+        Waits for the futures and returns their results, or None if `stop_event` was set first:
+        in that case the workers are stopped, the pending moves cancelled and the running ones awaited.
+        """
+        pending = set(futures)
+        while pending:
+            if stop_event is not None and stop_event.is_set():
+                self._stop.set()
+                running = [future for future in futures if not future.cancel()]
+                wait(running)
+                self._stop.clear()
+                return None
+            _, pending = wait(pending, timeout=STOP_POLL_INTERVAL if stop_event is not None else None)
+        return [future.result() for future in futures]
+
+    def search(self, fen, root_moves, depth, deadline=None, stop_event=None, max_nodes=None):
+        """
+        Searches the given root moves (in their order of preference) to the given depth.
+        `max_nodes` bounds the nodes of every root move; the caller checks the total.
+        Returns the best value, the index of the best move, the number of nodes searched, the
+        principal variation after the best move (UCI strings) and the selective depth reached.
+        Returns None as value if the deadline expired, a root move ran out of nodes or `stop_event`
+        was set before the search was completed.
+        """
+        pool = self._ensure_pool()
+        self._search_id += 1
+        with self._alpha.get_lock():
+            self._alpha.value = -math.inf
+
+        futures = [pool.submit(_search_root_move, fen, move.uci(), depth, self._search_id, deadline, None,
+                               max_nodes) for move in root_moves]
+        results = self._results(futures, stop_event)
+        if results is None:
+            return None, None, 0, [], 0
+        nodes = sum(result[2] for result in results)
+        if any(result[0] is None for result in results):
+            return None, None, nodes, [], 0
+
+        # Valori esatti: quelli che superano l'alpha con cui è partita la ricerca
+        exact = {i: value for i, (value, alpha, *_) in enumerate(results) if value > alpha}
+        best_value = max(exact.values()) if exact else max(result[0] for result in results)
+
+        # Un limite superiore >= del miglior valore, prima della mossa migliore, può nascondere un pareggio
+        first_best = min((i for i, value in exact.items() if value == best_value), default=len(results))
+        retry = [i for i in range(first_best) if i not in exact and results[i][0] >= best_value]
+        if retry:
+            futures = [pool.submit(_search_root_move, fen, root_moves[i].uci(), depth, self._search_id,
+                                   deadline, -math.inf, max_nodes) for i in retry]
+            retried = self._results(futures, stop_event)
+            if retried is None:
+                return None, None, nodes, [], 0
+            for i, result in zip(retry, retried):
+                nodes += result[2]
+                if result[0] is None:
+                    return None, None, nodes, [], 0
+                exact[i] = result[0]
+                results[i] = result
+            best_value = max(exact.values())
+
+        best_index = min(i for i, value in exact.items() if value == best_value)
+        seldepth = max(result[4] for result in results)
+        return best_value, best_index, nodes, results[best_index][3], seldepth
+
+    def close(self):
+        """
+        Shuts down the worker pool.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,176 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+import chess
+import chess.polyglot
+from minmax_agent import get_chess_children
+
+# Posizioni di riferimento con il numero di nodi atteso per profondità
+# (https://www.chessprogramming.org/Perft_Results)
+PERFT_SUITE = (
+    ("startpos", chess.STARTING_FEN,
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    ("position3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    ("position4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("position5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    ("position6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     {1: 46, 2: 2079, 3: 89890, 4: 3894594}),
+)
+
+# Numero massimo di voci della tabella hash di perft; quando è piena viene svuotata
+HASH_MAX_ENTRIES = 1 << 20
+
+
+def perft(board: chess.Board, depth: int, hash_table: dict = None, hash_function=chess.polyglot.zobrist_hash):
+    """
+    Conta le foglie dell'albero delle mosse legali a profondità `depth`, applicando e annullando
+    le mosse sulla board (push/pop). All'ultimo livello le mosse vengono solo contate (bulk counting).
+    Se `hash_table` è un dizionario, vi memorizza i conteggi per (hash della posizione, profondità)
+    e li riusa per le trasposizioni.
+    """
+    if depth <= 1:
+        return board.legal_moves.count() if depth == 1 else 1
+    if hash_table is not None:
+        key = (hash_function(board), depth)
+        count = hash_table.get(key)
+        if count is not None:
+            return count
+    count = 0
+    for move in board.legal_moves:
+        board.push(move)
+        count += perft(board, depth - 1, hash_table, hash_function)
+        board.pop()
+    if hash_table is not None:
+        if len(hash_table) >= HASH_MAX_ENTRIES:
+            hash_table.clear()
+        hash_table[key] = count
+    return count
+
+
+def perft_children(board: chess.Board, depth: int, get_children=get_chess_children):
+    """
+    Come `perft`, ma genera i successori con una funzione che restituisce gli stati figli
+    (di default `get_chess_children`), per misurarne il throughput.
+    """
+    if depth <= 0:
+        return 1
+    children = get_children(board)
+    if depth == 1:
+        return len(children)
+    return sum(perft_children(child, depth - 1, get_children) for child in children)
+
+
+def divide(board: chess.Board, depth: int, hash_table: dict = None, children: bool = False):
+    """
+    Perft suddiviso per mossa della radice: restituisce un dizionario mossa UCI -> foglie.
+    Utile per trovare la mossa su cui un generatore sbaglia il conteggio.
+    Con `children` i conteggi sotto ogni mossa usano `perft_children` (senza tabella hash).
+    """
+    counts = {}
+    for move in list(board.legal_moves):
+        board.push(move)
+        if children:
+            counts[move.uci()] = perft_children(board, depth - 1)
+        else:
+            counts[move.uci()] = perft(board, depth - 1, hash_table)
+        board.pop()
+    return counts
+
+
+def _perft_root_move(fen, move_uci, depth, use_hash, children):
+    """
+    Conta le foglie sotto una mossa della radice in un processo worker.
+    """
+    board = chess.Board(fen)
+    board.push(chess.Move.from_uci(move_uci))
+    if children:
+        return perft_children(board, depth - 1)
+    return perft(board, depth - 1, {} if use_hash else None)
+
+
+def parallel_divide(board: chess.Board, depth: int, workers: int = None, use_hash: bool = False,
+                    children: bool = False):
+    """
+    `divide` con le mosse della radice distribuite su un pool di processi (uno per core se
+    `workers` è None). Ogni worker usa una propria tabella hash. Restituisce mossa UCI -> foglie.
+    """
+    fen = board.fen()
+    moves = [move.uci() for move in board.legal_moves]
+    if depth <= 0:
+        return {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {move: pool.submit(_perft_root_move, fen, move, depth, use_hash, children) for move in moves}
+        return {move: future.result() for move, future in futures.items()}
+
+
+def run_perft(board: chess.Board, depth: int, use_hash: bool = False, children: bool = False, workers: int = 1):
+    """
+    Perft con il generatore e le opzioni scelte; restituisce il numero di foglie.
+    """
+    if workers != 1 and depth > 1:
+        return sum(parallel_divide(board, depth, workers, use_hash, children).values())
+    if children:
+        return perft_children(board, depth)
+    return perft(board, depth, {} if use_hash else None)
+
+
+def run_suite(max_nodes: int = 1000000, use_hash: bool = False, children: bool = False, workers: int = 1,
+              verbose: bool = True):
+    """
+    Esegue perft sulle posizioni di `PERFT_SUITE`, per ogni profondità con al più `max_nodes` foglie
+    attese, e confronta i conteggi con quelli di riferimento.
+    Restituisce una lista di dizionari (nome, profondità, atteso, ottenuto, tempo, nodi al secondo).
+    """
+    results = []
+    for name, fen, expected in PERFT_SUITE:
+        for depth, nodes in sorted(expected.items()):
+            if nodes > max_nodes:
+                break
+            start = time.perf_counter()
+            got = run_perft(chess.Board(fen), depth, use_hash, children, workers)
+            elapsed = time.perf_counter() - start
+            result = {"name": name, "depth": depth, "expected": nodes, "nodes": got, "ok": got == nodes,
+                      "time": elapsed, "nps": int(got / elapsed) if elapsed > 0 else 0}
+            results.append(result)
+            if verbose:
+                print(f"{name:10} depth {depth}  {got:>9}  {'ok' if result['ok'] else f'FAIL (expected {nodes})'}"
+                      f"  {elapsed:7.3f}s  {result['nps']:>9} nps")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perft: move generation correctness and speed.")
+    parser.add_argument("--fen", default=chess.STARTING_FEN, help="position to count (default: start position)")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--divide", action="store_true", help="print the count of every root move")
+    parser.add_argument("--hash", action="store_true", help="reuse the counts of transpositions")
+    parser.add_argument("--children", action="store_true", help="generate successors with get_chess_children")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0: one per core)")
+    parser.add_argument("--suite", action="store_true", help="run the reference positions instead")
+    parser.add_argument("--max-nodes", type=int, default=1000000, help="largest suite count to run")
+    args = parser.parse_args()
+    workers = args.workers or None
+
+    if args.suite:
+        suite = run_suite(args.max_nodes, args.hash, args.children, workers)
+        raise SystemExit(0 if all(result["ok"] for result in suite) else 1)
+
+    board = chess.Board(args.fen)
+    start = time.perf_counter()
+    if args.divide:
+        if workers != 1:
+            counts = parallel_divide(board, args.depth, workers, args.hash, args.children)
+        else:
+            counts = divide(board, args.depth, {} if args.hash else None, args.children)
+        for move, nodes in counts.items():
+            print(f"{move}: {nodes}")
+        total = sum(counts.values())
+    else:
+        total = run_perft(board, args.depth, args.hash, args.children, workers)
+    elapsed = time.perf_counter() - start
+    print(f"nodes {total}  time {elapsed:.3f}s  nps {int(total / elapsed) if elapsed > 0 else 0}")
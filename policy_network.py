@@ -0,0 +1,293 @@
+import struct
+import zipfile
+import numpy as np
+import chess
+from batch_evaluation import PIECE_SQUARE_TABLE, bitboard_planes, encode_children
+
+# Dimensione dell'input della rete: i 12 piani da 64 case prodotti da `bitboard_planes`
+INPUT_SIZE = 12 * 64
+
+# Blocchi di input della rete multi-input, nell'ordine in cui sono concatenati (vedi `FeatureExtractor`)
+FEATURE_BLOCKS = (("planes", 12 * 64), ("side", 1), ("castling", 4), ("attacks", 2 * 64), ("move", 3))
+MULTI_INPUT_SIZE = sum(size for _, size in FEATURE_BLOCKS)
+
+
+def load_npz_mmap(path):
+    """
+    Carica gli array di un file .npz mappandoli in memoria in sola lettura, così più processi
+    che aprono lo stesso file ne condividono le pagine. Gli array compressi (np.savez_compressed)
+    non possono essere mappati e vengono letti normalmente.
+    Restituisce un dizionario nome -> array.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as file:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            # L'header locale del membro ha lunghezze proprie per nome e campo extra
+            file.seek(info.header_offset)
+            local_header = file.read(30)
+            name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=file.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return arrays
+
+
+def piece_square_weights(hidden: int = 2):
+    """
+    Pesi di una rete equivalente alla parte statica di `chess_H0` (materiale e centro):
+    con relu(x·t) - relu(-x·t) = x·t la rete restituisce esattamente i valori della tabella.
+    Utile come rete di partenza o di riferimento. Restituisce un dizionario per `save_weights`.
+    """
+    if hidden < 2:
+        raise ValueError("hidden must be at least 2")
+    table = PIECE_SQUARE_TABLE.reshape(-1).astype(np.float32)
+    w0 = np.zeros((INPUT_SIZE, hidden), dtype=np.float32)
+    w0[:, 0] = table
+    w0[:, 1] = -table
+    w1 = np.zeros((hidden, 1), dtype=np.float32)
+    w1[0, 0], w1[1, 0] = 1, -1
+    return {"W0": w0, "b0": np.zeros(hidden, dtype=np.float32),
+            "W1": w1, "b1": np.zeros(1, dtype=np.float32)}
+
+
+def multi_input_piece_square_weights(hidden: int = 2):
+    """
+    Pesi di una rete multi-input equivalente alla parte statica di `chess_H0`: usa solo il blocco
+    dei piani (come `piece_square_weights`) e ignora gli altri input.
+    """
+    weights = piece_square_weights(hidden)
+    w0 = np.zeros((MULTI_INPUT_SIZE, hidden), dtype=np.float32)
+    w0[:INPUT_SIZE] = weights["W0"]
+    weights["W0"] = w0
+    return weights
+
+
+def save_weights(path, weights):
+    """
+    Salva i pesi di una rete in un file .npz non compresso (quindi mappabile in memoria).
+    """
+    np.savez(path, **weights)
+
+
+class PolicyNetwork:
+    """
+    A small multilayer perceptron in pure NumPy that scores positions in batches.
+
+    The input of a position is its 12x64 piece planes (see `bitboard_planes`); the layers are
+    the arrays W0, b0, W1, b1, ... of the weights, with ReLU between them and a single linear
+    output, which is the value of the position for White. `__call__` takes the (n, 13) arrays
+    of `encode_boards`/`encode_children` and returns the values for the side to move, so the
+    network can replace `chess_H0_batch`.
+
+    Weights loaded from a file are memory-mapped; when the network is pickled (e.g. sent to a
+    worker process) only the path travels, and the worker maps the same file.
+    """
+
+    input_size = INPUT_SIZE
+    default_weights = staticmethod(piece_square_weights)
+
+    def __init__(self, weights=None, path=None):
+        """
+        Args:
+            weights (dict): The layer arrays, e.g. from `piece_square_weights`.
+            path (str): An .npz file with the layer arrays (alternative to `weights`).
+        """
+        if path is not None:
+            weights = load_npz_mmap(path)
+        elif weights is None:
+            weights = self.default_weights()
+        self.path = path
+        self.layers = []
+        while f"W{len(self.layers)}" in weights:
+            i = len(self.layers)
+            self.layers.append((weights[f"W{i}"], weights[f"b{i}"]))
+        if not self.layers or self.layers[0][0].shape[0] != self.input_size or self.layers[-1][0].shape[1] != 1:
+            raise ValueError(f"The weights must map {self.input_size} inputs to a single output.")
+
+    @classmethod
+    def load(cls, path):
+        """
+        Creates a network from an .npz weights file, memory-mapping it.
+        """
+        return cls(path=path)
+
+    def __reduce__(self):
+        if self.path is not None:
+            return self.__class__.load, (self.path,)
+        weights = {}
+        for i, (w, b) in enumerate(self.layers):
+            weights[f"W{i}"], weights[f"b{i}"] = np.asarray(w), np.asarray(b)
+        return self.__class__, (weights,)
+
+    def forward(self, planes):
+        """
+        Forward pass on an (n, input_size) input; returns the n output values.
+        """
+        x = planes
+        last = len(self.layers) - 1
+        for i, (w, b) in enumerate(self.layers):
+            x = x @ w + b
+            if i < last:
+                np.maximum(x, 0, out=x)
+        return x[:, 0]
+
+    def __call__(self, encoded):
+        planes = bitboard_planes(encoded).reshape(len(encoded), INPUT_SIZE).astype(np.float32)
+        white_values = self.forward(planes)
+        return np.where(encoded[:, 12] == 1, white_values, -white_values)
+
+
+class MultiInputNetwork(PolicyNetwork):
+    """
+    A `PolicyNetwork` whose input is the multi-input feature vector of a move built by
+    `FeatureExtractor` (see `FEATURE_BLOCKS`). It is called directly on the (n, MULTI_INPUT_SIZE)
+    feature array and its output is the value of each move for the player making it.
+    """
+
+    input_size = MULTI_INPUT_SIZE
+    default_weights = staticmethod(multi_input_piece_square_weights)
+
+    def __call__(self, features):
+        return self.forward(features)
+
+
+def _flip(bitboards):
+    # Ribalta verticalmente le bitboard: la traversa 1 diventa la 8 (inverte l'ordine dei byte)
+    return bitboards.byteswap()
+
+
+class FeatureExtractor:
+    """
+    Builds the multi-input features of the children of a node, as one contiguous float32 array
+    with a row per move and the blocks of `FEATURE_BLOCKS`, all seen by the player making the move
+    (own pieces first, board mirrored for Black):
+
+    - planes: the 12x64 piece planes of the position reached by the move;
+    - side: 1 if the move is played by White;
+    - castling: own and opponent kingside/queenside rights after the move;
+    - attacks: the squares attacked by each side in the parent position;
+    - move: whether the move is a capture, gives check, or is a promotion.
+
+    The per-position part (bitboards, attack maps, castling rights) is cached by position key,
+    so it is computed once per position however many times it is expanded; the per-move part
+    is computed for all the moves at once with NumPy.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        """
+        Args:
+            max_entries (int): Size of the per-position cache; it is emptied when full.
+        """
+        self.max_entries = max_entries
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """
+        Empties the cache and resets its counters.
+        """
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def position(self, board: chess.Board, key):
+        """
+        Returns the cached per-position features of `board`:
+        the attack planes (128 floats, own side first) and the castling masks.
+        """
+        features = self.cache.get(key)
+        if features is not None:
+            self.hits += 1
+            return features
+        self.misses += 1
+
+        color = board.turn
+        attacks = [0, 0]
+        for square in chess.scan_forward(board.occupied):
+            attacks[board.color_at(square)] |= board.attacks_mask(square)
+        masks = np.array([attacks[color], attacks[not color]], dtype=np.uint64)
+        if color == chess.BLACK:
+            masks = _flip(masks)
+        attack_planes = np.unpackbits(masks.astype('<u8').view(np.uint8), bitorder='little').astype(np.float32)
+
+        # Per ogni colore: traversa di partenza e case delle torri sul lato di re e di donna
+        sides = []
+        for side_color in (color, not color):
+            king = board.king(side_color)
+            backrank = chess.BB_RANK_1 if side_color == chess.WHITE else chess.BB_RANK_8
+            if king is None:
+                sides.append((backrank, 0, 0))
+                continue
+            kingside = sum(chess.BB_FILES[file] for file in range(chess.square_file(king) + 1, 8))
+            queenside = sum(chess.BB_FILES[file] for file in range(chess.square_file(king)))
+            sides.append((backrank, backrank & kingside, backrank & queenside))
+
+        if len(self.cache) >= self.max_entries:
+            self.cache = {}
+        features = (attack_planes, board.castling_rights, sides)
+        self.cache[key] = features
+        return features
+
+    def children(self, board: chess.Board, key, moves, checks):
+        """
+        Returns the (n, MULTI_INPUT_SIZE) float32 features of the given moves of `board`.
+
+        Args:
+            board (chess.Board): The parent position.
+            key (int): The key of the parent position in the cache (e.g. its Zobrist hash).
+            moves (list): The `chess.Move`s to describe.
+            checks (np.ndarray): For every move, whether it gives check.
+        """
+        attack_planes, castling_rights, sides = self.position(board, key)
+        color = board.turn
+        n = len(moves)
+        one = np.uint64(1)
+        from_bits = one << np.array([move.from_square for move in moves], dtype=np.uint64)
+        to_squares = np.array([move.to_square for move in moves], dtype=np.uint64)
+        to_bits = one << to_squares
+
+        features = np.empty((n, MULTI_INPUT_SIZE), dtype=np.float32)
+        start = 0
+        # Piani dei figli, con i pezzi propri per primi e la scacchiera ribaltata per il Nero
+        bitboards = encode_children(board, moves)[:, :12]
+        if color == chess.BLACK:
+            bitboards = _flip(np.concatenate((bitboards[:, 6:], bitboards[:, :6]), axis=1))
+        features[:, start:start + 768] = bitboard_planes(bitboards).reshape(n, 768)
+        start += 768
+
+        features[:, start] = float(color == chess.WHITE)
+        start += 1
+
+        # Diritti di arrocco dopo la mossa: si perdono muovendo il re o muovendo/catturando una torre
+        rights = np.full(n, castling_rights, dtype=np.uint64) & ~(from_bits | to_bits)
+        king_bit = np.uint64(board.kings & board.occupied_co[color])
+        own_backrank = np.uint64(sides[0][0])
+        rights[(from_bits & king_bit) != 0] &= ~own_backrank
+        for i, (_, kingside, queenside) in enumerate(sides):
+            features[:, start + 2 * i] = (rights & np.uint64(kingside)) != 0
+            features[:, start + 2 * i + 1] = (rights & np.uint64(queenside)) != 0
+        start += 4
+
+        features[:, start:start + 128] = attack_planes
+        start += 128
+
+        enemy = np.uint64(board.occupied_co[not color])
+        captures = ((enemy >> to_squares) & one) != 0
+        if board.ep_square is not None:
+            pawns = np.uint64(board.pawns)
+            captures |= (to_squares == board.ep_square) & ((pawns & from_bits) != 0)
+        features[:, start] = captures
+        features[:, start + 1] = checks
+        features[:, start + 2] = [move.promotion is not None for move in moves]
+        return features
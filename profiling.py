@@ -0,0 +1,239 @@
+import argparse
+import os
+import sys
+import threading
+import time
+import chess
+from minmax_agent import MinMaxAgent, Algorithms, chess_H0, get_chess_children, get_chess_moves, is_chess_final
+
+# Fasi misurate e attributi dell'agente che le implementano
+PHASES = {
+    "generation": ("get_moves", "_generate_noisy"),
+    "evaluation": ("H_0", "final_H0", "H0_batch", "predictor", "mi_predictor"),
+    "terminal": ("is_final",),
+    "ordering": ("_order_moves", "_rank_children", "_rank_children_batch", "_rank_children_predicted",
+                 "_rank_children_multi_input"),
+}
+
+
+class PhaseTimer:
+    """
+    Measures the exclusive time spent in each phase of a search: the agent's functions are wrapped
+    so that the time of a phase called from inside another one (e.g. the evaluations made while
+    ranking the children) is charged to the inner phase only.
+    """
+
+    def __init__(self):
+        self.times = {phase: 0.0 for phase in PHASES}
+        self.calls = {phase: 0 for phase in PHASES}
+        # Tempo delle fasi annidate in quelle in corso, una voce per livello
+        self._nested = []
+
+    def wrap(self, phase, function):
+        """
+        Returns a wrapper of `function` that charges its time to `phase`.
+        """
+        nested = self._nested
+
+        def timed(*args, **kwargs):
+            nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.times[phase] += elapsed - nested.pop()
+                self.calls[phase] += 1
+                if nested:
+                    nested[-1] += elapsed
+        return timed
+
+    def instrument(self, agent):
+        """
+        Wraps the phase functions of `agent`; returns the original attributes for `restore`.
+        """
+        originals = {}
+        for phase, names in PHASES.items():
+            for name in names:
+                originals[name] = agent.__dict__.get(name)
+                setattr(agent, name, self.wrap(phase, getattr(agent, name)))
+        return originals
+
+    @staticmethod
+    def restore(agent, originals):
+        """
+        Restores the attributes replaced by `instrument` (methods go back to the class ones).
+        """
+        for name, original in originals.items():
+            if original is None:
+                delattr(agent, name)
+            else:
+                setattr(agent, name, original)
+
+
+class SamplingProfiler:
+    """
+    A statistical profiler without external dependencies: a background thread samples the stack
+    of the profiled thread (via `sys._current_frames`) every `interval` seconds and counts the
+    distinct stacks, which can be exported in the collapsed format read by flame-graph tools
+    (flamegraph.pl, speedscope, inferno).
+
+    Sampling needs the GIL, so while profiling the interpreter's switch interval is lowered
+    to `interval` and restored afterwards.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        """
+        Args:
+            interval (float): Seconds between two samples.
+        """
+        self.interval = interval
+        self.samples = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._switch_interval = None
+
+    def start(self, thread_id=None):
+        """
+        Starts sampling the given thread (the calling one by default).
+        """
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self._stop.clear()
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread = threading.Thread(target=self._run, args=(target,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._switch_interval is not None:
+            sys.setswitchinterval(self._switch_interval)
+            self._switch_interval = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self, target):
+        samples = self.samples
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            samples[key] = samples.get(key, 0) + 1
+
+    def collapsed(self):
+        """
+        Returns the samples in collapsed-stack format: one "frame;frame;... count" line per stack.
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(self.samples.items()))
+
+    def write_collapsed(self, path):
+        """
+        Writes the collapsed stacks to a file.
+        """
+        with open(path, "w") as file:
+            file.write(self.collapsed() + "\n")
+
+
+class SearchProfile:
+    """
+    The profile of a search: the search result, the exclusive time of each phase
+    (the rest of the total time is the search itself) and the sampled stacks.
+    """
+
+    def __init__(self, result, total_time, timer, sampler):
+        self.result = result
+        self.total_time = total_time
+        self.phase_times = dict(timer.times)
+        self.phase_calls = dict(timer.calls)
+        self.phase_times["search"] = max(total_time - sum(timer.times.values()), 0.0)
+        self.sampler = sampler
+
+    def collapsed(self):
+        return self.sampler.collapsed() if self.sampler is not None else ""
+
+    def write_collapsed(self, path):
+        self.sampler.write_collapsed(path)
+
+    def report(self):
+        """
+        Returns a table of the phase timings as a string.
+        """
+        lines = [f"total {self.total_time:.3f}s  nodes {self.result.nodes}"]
+        for phase, seconds in sorted(self.phase_times.items(), key=lambda item: -item[1]):
+            share = seconds / self.total_time if self.total_time > 0 else 0.0
+            calls = self.phase_calls.get(phase)
+            lines.append(f"{phase:12} {seconds:8.3f}s {share:6.1%}" + (f"  {calls} calls" if calls is not None else ""))
+        return "\n".join(lines)
+
+
+def profile_search(agent: MinMaxAgent, state, depth: int, sample: bool = True, interval: float = 0.001,
+                   time_limit_ms: int = None):
+    """
+    Esegue `agent.find_best_move` (o `find_best_move_timed` se è dato `time_limit_ms`) misurando
+    il tempo di ogni fase e, se `sample` è True, campionando lo stack della ricerca.
+    Al termine l'agente torna alle sue funzioni originali. Restituisce un `SearchProfile`.
+    """
+    timer = PhaseTimer()
+    sampler = SamplingProfiler(interval) if sample else None
+    originals = timer.instrument(agent)
+    try:
+        if sampler is not None:
+            sampler.start()
+        start = time.perf_counter()
+        try:
+            if time_limit_ms is not None:
+                result = agent.find_best_move_timed(state, time_limit_ms)
+            else:
+                result = agent.find_best_move(state, depth)
+        finally:
+            total_time = time.perf_counter() - start
+            if sampler is not None:
+                sampler.stop()
+    finally:
+        PhaseTimer.restore(agent, originals)
+    return SearchProfile(result, total_time, timer, sampler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile a search: phase timings and collapsed stacks.")
+    parser.add_argument("--fen", default=chess.STARTING_FEN)
+    parser.add_argument("--algorithm", default=Algorithms.FAIL_SOFT_ALPHA_BETA.value,
+                        choices=[algorithm.value for algorithm in Algorithms])
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--movetime", type=int, help="search for this many milliseconds instead of a fixed depth")
+    parser.add_argument("--children", action="store_true", help="generate successors with get_chess_children")
+    parser.add_argument("--interval", type=float, default=0.001, help="seconds between stack samples")
+    parser.add_argument("--out", help="write the collapsed stacks to this file (input of flamegraph.pl)")
+    args = parser.parse_args()
+
+    algorithm = Algorithms(args.algorithm)
+    if args.children:
+        agent = MinMaxAgent(algorithm, chess_H0, get_chess_children, is_chess_final)
+    else:
+        agent = MinMaxAgent(algorithm, chess_H0, None, is_chess_final, get_moves_function=get_chess_moves)
+    try:
+        profile = profile_search(agent, chess.Board(args.fen), args.depth, args.out is not None, args.interval,
+                                 args.movetime)
+    finally:
+        agent.close()
+    print(profile.result)
+    print(profile.report())
+    if args.out:
+        profile.write_collapsed(args.out)
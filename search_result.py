@@ -0,0 +1,39 @@
+class SearchResult:
+    """
+    The result of a search: best move, score, principal variation and search statistics.
+
+    For compatibility with the `(value, move)` tuples of the engines, a result can be unpacked
+    as `score, best_move = result`.
+    """
+
+    __slots__ = ("best_move", "score", "pv", "depth", "seldepth", "nodes", "time", "nps")
+
+    def __init__(self, best_move, score, pv=(), depth=0, seldepth=0, nodes=0, time=0.0):
+        """
+        Args:
+            best_move: The best move (a `chess.Move`, or the best successor state for agents
+                built from get_children_function).
+            score (float): The value of the best move for the player to move at the root.
+            pv (list): The principal variation as a list of `chess.Move`s.
+            depth (int): The depth of the completed search.
+            seldepth (int): The greatest distance from the root reached by the search.
+            nodes (int): The number of nodes searched.
+            time (float): The search time in seconds.
+        """
+        self.best_move = best_move
+        self.score = score
+        self.pv = list(pv)
+        self.depth = depth
+        self.seldepth = seldepth
+        self.nodes = nodes
+        self.time = time
+        self.nps = int(nodes / time) if time > 0 else 0
+
+    def __iter__(self):
+        yield self.score
+        yield self.best_move
+
+    def __repr__(self):
+        pv = " ".join(move.uci() for move in self.pv)
+        return (f"SearchResult(score={self.score}, best_move={self.best_move!r}, pv=[{pv}], depth={self.depth}, "
+                f"seldepth={self.seldepth}, nodes={self.nodes}, time={self.time:.3f}, nps={self.nps})")
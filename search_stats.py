@@ -0,0 +1,136 @@
+import time
+
+
+class SearchStats:
+    """
+    Counters and timings of a search, collected by wrapping the functions the agent calls
+    (move generation, static evaluation, cutoff notification) when instrumentation is enabled
+    (see `MinMaxAgent.enable_stats`). When it is disabled the agent calls the original functions,
+    so the search pays nothing for it.
+
+    Times are in seconds; the search time is the total time minus generation and evaluation.
+    """
+
+    __slots__ = ("nodes", "evaluations", "generations", "children", "cutoffs", "first_move_cutoffs",
+                 "generation_time", "evaluation_time", "time", "depth")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all the counters.
+        """
+        self.nodes = 0
+        self.evaluations = 0
+        self.generations = 0
+        self.children = 0
+        # Tagli per profondità rimanente del nodo
+        self.cutoffs = {}
+        self.first_move_cutoffs = 0
+        self.generation_time = 0.0
+        self.evaluation_time = 0.0
+        self.time = 0.0
+        self.depth = 0
+
+    def wrap_generation(self, function):
+        """
+        Wraps a move/children generation function, counting calls, children produced and time.
+        """
+        def generate(state):
+            start = time.perf_counter()
+            children = function(state)
+            self.generation_time += time.perf_counter() - start
+            self.generations += 1
+            self.children += len(children)
+            return children
+        return generate
+
+    def wrap_evaluation(self, function):
+        """
+        Wraps a static evaluation function, counting calls and time.
+        """
+        def evaluate(state):
+            start = time.perf_counter()
+            value = function(state)
+            self.evaluation_time += time.perf_counter() - start
+            self.evaluations += 1
+            return value
+        return evaluate
+
+    def wrap_batch_evaluation(self, function):
+        """
+        Wraps a batch evaluation function (or network), counting the positions evaluated and time.
+        """
+        def evaluate_batch(batch):
+            start = time.perf_counter()
+            values = function(batch)
+            self.evaluation_time += time.perf_counter() - start
+            self.evaluations += len(values)
+            return values
+        return evaluate_batch
+
+    def wrap_cutoff(self, function):
+        """
+        Wraps the agent's cutoff notification (state, move, ply, depth, index), counting the
+        cutoffs per remaining depth and those caused by the first move searched.
+        """
+        def record_cutoff(state, move, ply, depth, index):
+            self.cutoffs[depth] = self.cutoffs.get(depth, 0) + 1
+            if index == 0:
+                self.first_move_cutoffs += 1
+            function(state, move, ply, depth, index)
+        return record_cutoff
+
+    @property
+    def search_time(self):
+        return max(self.time - self.generation_time - self.evaluation_time, 0.0)
+
+    @property
+    def average_branching_factor(self):
+        """
+        Average number of children produced per expanded node.
+        """
+        return self.children / self.generations if self.generations else 0.0
+
+    @property
+    def effective_branching_factor(self):
+        """
+        The branching factor b of a uniform tree of the search depth with as many nodes
+        (nodes ** (1 / depth)): how much pruning reduced the average branching.
+        """
+        return self.nodes ** (1 / self.depth) if self.depth > 0 and self.nodes > 0 else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        """
+        Fraction of cutoffs caused by the first move searched (a measure of move ordering).
+        """
+        total = sum(self.cutoffs.values())
+        return self.first_move_cutoffs / total if total else 0.0
+
+    def as_dict(self):
+        """
+        Returns the counters, the derived values and the time split as a dictionary.
+        """
+        return {
+            "nodes": self.nodes,
+            "evaluations": self.evaluations,
+            "generations": self.generations,
+            "children": self.children,
+            "cutoffs": dict(sorted(self.cutoffs.items())),
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "average_branching_factor": self.average_branching_factor,
+            "effective_branching_factor": self.effective_branching_factor,
+            "depth": self.depth,
+            "time": self.time,
+            "generation_time": self.generation_time,
+            "evaluation_time": self.evaluation_time,
+            "search_time": self.search_time,
+        }
+
+    def __repr__(self):
+        return (f"SearchStats(nodes={self.nodes}, evaluations={self.evaluations}, generations={self.generations}, "
+                f"children={self.children}, cutoffs={sum(self.cutoffs.values())}, "
+                f"ebf={self.effective_branching_factor:.2f}, time={self.time:.3f}, "
+                f"generation={self.generation_time:.3f}, evaluation={self.evaluation_time:.3f})")
@@ -0,0 +1,32 @@
+import chess
+from minmax_agent import MinMaxAgent, Algorithms, chess_H0, get_chess_moves, is_chess_final
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+# Ricerca senza potature selettive, che dà il valore esatto di ogni mossa
+EXACT_OPTIONS = dict(null_move=False, late_move_reductions=False, futility_margins=(), razoring_margins=())
+
+
+def _agent(algorithm, **options):
+    return MinMaxAgent(algorithm, chess_H0, None, is_chess_final, get_moves_function=get_chess_moves, **options)
+
+
+def test_multi_pv_lines_are_exact_and_sorted():
+    depth = 3
+    for algorithm in (Algorithms.FAIL_HARD_ALPHA_BETA, Algorithms.FAIL_SOFT_ALPHA_BETA, Algorithms.PVS,
+                      Algorithms.MTDF):
+        agent = _agent(algorithm)
+        lines = agent.find_multi_pv(chess.Board(KIWIPETE), depth, 4)
+        assert len(lines) == 4, algorithm
+        scores = [line.score for line in lines]
+        assert scores == sorted(scores, reverse=True), algorithm
+
+        expected = _agent(algorithm, **EXACT_OPTIONS).find_multi_pv(chess.Board(KIWIPETE), depth, 4)
+        assert scores == [line.score for line in expected], algorithm
+        for line in lines:
+            board = chess.Board(KIWIPETE)
+            board.push(line.pv[0])
+            value = _agent(algorithm, **EXACT_OPTIONS).find_best_move(board, depth - 1).score
+            assert line.score == -value, (algorithm, line.pv[0])
+        # Le opzioni dell'agente tornano quelle di prima
+        assert agent.null_move and agent.late_move_reductions and agent.futility_margins, algorithm
@@ -0,0 +1,85 @@
+import math
+import threading
+import time
+import chess
+from minmax_agent import MinMaxAgent, Algorithms, chess_H0, get_chess_moves, is_chess_final
+
+POSITIONS = (
+    chess.STARTING_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1",
+    "8/8/4k3/8/2K5/8/3P4/8 w - - 0 1",
+)
+
+# Opzioni di ricerca diverse da quelle di default, con cui la ricerca non dipende dalla finestra
+# (le potature selettive possono dare valori diversi con finestre diverse)
+EXACT_OPTIONS = dict(null_move=False, late_move_reductions=False, futility_margins=(), razoring_margins=(),
+                     check_extensions=False, aspiration_widths=(), first_guess="static")
+
+SELECTIVE_OPTIONS = dict(null_move=False, late_move_reductions=False, futility_margins=(100, 200),
+                         razoring_margins=(200,), check_extensions=False, aspiration_widths=(25, 100),
+                         first_guess="static")
+
+
+def _agent(algorithm, workers=1, **options):
+    return MinMaxAgent(algorithm, chess_H0, None, is_chess_final, get_moves_function=get_chess_moves,
+                       workers=workers, **options)
+
+
+def test_workers_receive_search_options():
+    for algorithm in (Algorithms.FAIL_SOFT_ALPHA_BETA, Algorithms.LAZY_SMP):
+        agent = _agent(algorithm, workers=2, **SELECTIVE_OPTIONS)
+        try:
+            parallel = agent.root_parallel or agent.lazy_smp_search
+            for name, value in SELECTIVE_OPTIONS.items():
+                assert parallel.agent_args[name] == value, name
+        finally:
+            agent.close()
+
+
+def test_parallel_matches_sequential_with_non_default_options():
+    for algorithm in (Algorithms.FAIL_HARD_ALPHA_BETA, Algorithms.FAIL_SOFT_ALPHA_BETA, Algorithms.PVS):
+        for fen in POSITIONS:
+            sequential = _agent(algorithm, **EXACT_OPTIONS)
+            parallel = _agent(algorithm, workers=2, **EXACT_OPTIONS)
+            try:
+                expected = sequential.find_best_move(chess.Board(fen), 3)
+                result = parallel.find_best_move(chess.Board(fen), 3)
+            finally:
+                parallel.close()
+            assert result.score == expected.score, (algorithm, fen)
+            assert parallel._move_of(result.best_move) == sequential._move_of(expected.best_move), (algorithm, fen)
+            assert result.pv == expected.pv and result.seldepth == expected.seldepth, (algorithm, fen)
+
+
+def test_stop_event_interrupts_parallel_search():
+    for algorithm in (Algorithms.FAIL_SOFT_ALPHA_BETA, Algorithms.LAZY_SMP):
+        agent = _agent(algorithm, workers=2)
+        agent.stop_event = threading.Event()
+        timer = threading.Timer(0.5, agent.stop_event.set)
+        try:
+            timer.start()
+            start = time.perf_counter()
+            result = agent.find_best_move_timed(chess.Board(POSITIONS[1]), math.inf)
+            assert time.perf_counter() - start < 5, algorithm
+            assert result.best_move is not None, algorithm
+            # Dopo lo stop la ricerca successiva riparte normalmente
+            agent.stop_event.clear()
+            assert agent.find_best_move(chess.Board(POSITIONS[1]), 2).best_move is not None, algorithm
+        finally:
+            timer.cancel()
+            agent.close()
+
+
+def test_node_budget_stops_root_parallel_search():
+    sequential = _agent(Algorithms.FAIL_SOFT_ALPHA_BETA)
+    parallel = _agent(Algorithms.FAIL_SOFT_ALPHA_BETA, workers=2)
+    try:
+        expected = sequential.find_best_move_timed(chess.Board(), math.inf, max_nodes=2000, max_depth=7)
+        result = parallel.find_best_move_timed(chess.Board(), math.inf, max_nodes=2000, max_depth=7)
+    finally:
+        parallel.close()
+    # I nodi dei worker dipendono da quali mosse della radice ricevono: la profondità può essere minore
+    assert 1 <= result.depth <= expected.depth < 7
@@ -0,0 +1,19 @@
+import chess
+from minmax_agent import MinMaxAgent, Algorithms, chess_H0, get_chess_children, get_chess_moves, is_chess_final
+
+# Il Nero ha subito scacco matto
+CHECKMATED = "R5k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1"
+
+
+def test_terminal_and_leaf_roots_have_no_move():
+    for algorithm in Algorithms:
+        for options in (dict(get_moves_function=get_chess_moves), dict()):
+            children = None if options else get_chess_children
+            agent = MinMaxAgent(algorithm, chess_H0, children, is_chess_final, **options)
+            try:
+                for fen, depth in ((CHECKMATED, 3), (chess.STARTING_FEN, 0)):
+                    result = agent.find_best_move(chess.Board(fen), depth)
+                    assert result.best_move is None and result.pv == [], (algorithm, fen)
+                assert agent.find_best_move(chess.Board(), 2).best_move is not None, algorithm
+            finally:
+                agent.close()
@@ -0,0 +1,26 @@
+import threading
+import chess
+import pytest
+from minmax_agent import MinMaxAgent, Algorithms, SearchTimeout, chess_H0, get_chess_moves, is_chess_final
+
+
+def _stopped_agent(delay):
+    agent = MinMaxAgent(Algorithms.FAIL_SOFT_ALPHA_BETA, chess_H0, None, is_chess_final,
+                        get_moves_function=get_chess_moves)
+    agent.stop_event = threading.Event()
+    timer = threading.Timer(delay, agent.stop_event.set)
+    timer.start()
+    return agent, timer
+
+
+def test_stopped_search_restores_the_board():
+    for search in (lambda agent, board: agent.find_best_move(board, 8),
+                   lambda agent, board: agent.find_multi_pv(board, 6, 5)):
+        agent, timer = _stopped_agent(0.2)
+        board = chess.Board()
+        try:
+            with pytest.raises(SearchTimeout):
+                search(agent, board)
+        finally:
+            timer.cancel()
+        assert board.fen() == chess.STARTING_FEN and not board.move_stack
@@ -0,0 +1,305 @@
+from array import array
+from multiprocessing import shared_memory
+import chess
+
+# Tipi di bound memorizzati in una entry (0 indica uno slot vuoto)
+EMPTY = 0
+EXACT = 1
+LOWERBOUND = 2
+UPPERBOUND = 3
+
+# Byte occupati da una entry: key (8) + depth (1) + flag (1) + score (8) + move (2) + age (1)
+ENTRY_SIZE = 21
+
+
+def flip_bound(flag):
+    """
+    Restituisce il bound visto dal punto di vista dell'avversario.
+    """
+    if flag == LOWERBOUND:
+        return UPPERBOUND
+    if flag == UPPERBOUND:
+        return LOWERBOUND
+    return flag
+
+
+def encode_move(move):
+    """
+    Codifica una chess.Move in un intero a 16 bit (0 = nessuna mossa).
+    """
+    if not move:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code):
+    """
+    Decodifica un intero prodotto da `encode_move` in una chess.Move (o None).
+    """
+    if not code:
+        return None
+    promotion = code >> 12
+    return chess.Move(code & 63, (code >> 6) & 63, promotion or None)
+
+
+class TranspositionTable:
+    """
+    A fixed-size transposition table backed by parallel `array` columns.
+
+    Entries are indexed by `key % capacity`, where the key is a Zobrist hash.
+    Each entry stores the search depth, the bound type, the score, the best
+    move and the age (search generation) at which it was written.
+
+    Replacement policy: an occupied slot is overwritten when it holds the same
+    position, when it was written by an older search, or when the new entry
+    was searched at least as deep as the stored one.
+    """
+
+    def __init__(self, size_mb: float = 16):
+        """
+        Allocates the table.
+
+        Args:
+            size_mb (float): Memory budget in megabytes; it determines the number of entries.
+        """
+        self.capacity = max(1, int(size_mb * 1024 * 1024) // ENTRY_SIZE)
+        self.keys = array('Q', bytes(8 * self.capacity))
+        self.depths = array('b', bytes(self.capacity))
+        self.flags = array('B', bytes(self.capacity))
+        self.scores = array('d', bytes(8 * self.capacity))
+        self.moves = array('H', bytes(2 * self.capacity))
+        self.ages = array('B', bytes(self.capacity))
+        self.age = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Resets the probe/hit/store/collision counters.
+        """
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.collisions = 0
+
+    def clear(self):
+        """
+        Empties the table and resets the counters.
+        """
+        self.flags = array('B', bytes(self.capacity))
+        self.age = 0
+        self.reset_stats()
+
+    def new_search(self):
+        """
+        Starts a new search generation, so entries from previous searches become replaceable.
+        """
+        self.age = (self.age + 1) & 0xFF
+
+    def probe(self, key):
+        """
+        Looks up a position.
+        Returns a (depth, flag, score, move) tuple, or None if the position is not stored.
+        """
+        self.probes += 1
+        index = key % self.capacity
+        if self.flags[index] == EMPTY:
+            return None
+        if self.keys[index] != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return self.depths[index], self.flags[index], self.scores[index], decode_move(self.moves[index])
+
+    def store(self, key, depth, flag, score, move=None):
+        """
+        Stores a search result, subject to the replacement policy.
+        """
+        index = key % self.capacity
+        if self.flags[index] != EMPTY and self.keys[index] != key \
+                and self.ages[index] == self.age and depth < self.depths[index]:
+            return
+        self.keys[index] = key
+        self.depths[index] = max(-128, min(127, depth))
+        self.flags[index] = flag
+        self.scores[index] = score
+        self.moves[index] = encode_move(move)
+        self.ages[index] = self.age
+        self.stores += 1
+
+    def hashfull(self):
+        """
+        Returns the permille of occupied entries, sampling the first 1000 slots.
+        """
+        sample = min(1000, self.capacity)
+        used = sum(1 for i in range(sample) if self.flags[i] != EMPTY)
+        return used * 1000 // sample
+
+    def stats(self):
+        """
+        Returns the table counters as a dictionary.
+        """
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "stores": self.stores,
+            "collisions": self.collisions,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+        }
+
+
+# Layout dei 64 bit di dati di una entry condivisa
+_SCORE_BITS = 32
+_SCORE_OFFSET = 1 << 31
+_SCORE_INF = (1 << 31) - 1
+_MASK64 = (1 << 64) - 1
+
+
+def _pack(depth, flag, score, move, age):
+    if score == float('inf'):
+        score = _SCORE_INF
+    elif score == float('-inf'):
+        score = -_SCORE_INF
+    else:
+        score = max(-_SCORE_INF + 1, min(_SCORE_INF - 1, int(round(score))))
+    return ((score + _SCORE_OFFSET)
+            | ((depth & 0xFF) << 32)
+            | (flag << 40)
+            | ((age & 0x3F) << 42)
+            | (encode_move(move) << 48))
+
+
+def _unpack(data):
+    score = (data & 0xFFFFFFFF) - _SCORE_OFFSET
+    if score == _SCORE_INF:
+        score = float('inf')
+    elif score == -_SCORE_INF:
+        score = float('-inf')
+    depth = (data >> 32) & 0xFF
+    if depth >= 128:
+        depth -= 256
+    return depth, (data >> 40) & 0x3, score, (data >> 42) & 0x3F, data >> 48
+
+
+class SharedTranspositionTable:
+    """
+    A transposition table living in `multiprocessing.shared_memory`, shared by several
+    processes without locks.
+
+    Every entry is two 64-bit words: the packed data (score, depth, bound, age, move) and
+    the key XOR-ed with the data. A reader accepts an entry only if the two words XOR back
+    to its key, so entries torn by concurrent writes are discarded as misses.
+    Scores are stored as 32-bit integers (infinite scores are preserved).
+
+    It has the same interface as `TranspositionTable`; the counters are per process.
+    """
+
+    def __init__(self, size_mb: float = 16, name: str = None):
+        """
+        Creates a new table, or attaches to an existing one when `name` is given.
+
+        Args:
+            size_mb (float): Memory budget in megabytes (ignored when attaching).
+            name (str): Name of the shared memory block of an existing table.
+        """
+        if name is None:
+            capacity = max(1, int(size_mb * 1024 * 1024) // 16)
+            self.shm = shared_memory.SharedMemory(create=True, size=capacity * 16)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.capacity = self.shm.size // 16
+        self.words = self.shm.buf.cast('Q')
+        self.age = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Resets the probe/hit/store/collision counters of this process.
+        """
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.collisions = 0
+
+    def clear(self):
+        """
+        Empties the table and resets the counters.
+        """
+        self.shm.buf[:self.capacity * 16] = bytes(self.capacity * 16)
+        self.age = 0
+        self.reset_stats()
+
+    def new_search(self):
+        """
+        Starts a new search generation, so entries from previous searches become replaceable.
+        """
+        self.age = (self.age + 1) & 0x3F
+
+    def probe(self, key):
+        """
+        Looks up a position.
+        Returns a (depth, flag, score, move) tuple, or None if the position is not stored.
+        """
+        self.probes += 1
+        index = (key % self.capacity) << 1
+        data = self.words[index + 1]
+        if not data:
+            return None
+        if self.words[index] ^ data != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        depth, flag, score, _, move = _unpack(data)
+        return depth, flag, score, decode_move(move)
+
+    def store(self, key, depth, flag, score, move=None):
+        """
+        Stores a search result, subject to the same replacement policy as `TranspositionTable`.
+        """
+        index = (key % self.capacity) << 1
+        old = self.words[index + 1]
+        if old and self.words[index] ^ old != key:
+            old_depth, _, _, old_age, _ = _unpack(old)
+            if old_age == self.age and depth < old_depth:
+                return
+        data = _pack(max(-128, min(127, depth)), flag, score, move, self.age)
+        self.words[index] = (key ^ data) & _MASK64
+        self.words[index + 1] = data
+        self.stores += 1
+
+    def hashfull(self):
+        """
+        Returns the permille of occupied entries, sampling the first 1000 slots.
+        """
+        sample = min(1000, self.capacity)
+        used = sum(1 for i in range(sample) if self.words[(i << 1) + 1])
+        return used * 1000 // sample
+
+    def stats(self):
+        """
+        Returns the table counters of this process as a dictionary.
+        """
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "stores": self.stores,
+            "collisions": self.collisions,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+        }
+
+    def close(self):
+        """
+        Detaches from the shared memory; the creating process also frees it.
+        """
+        if self.words is None:
+            return
+        self.words.release()
+        self.words = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __del__(self):
+        self.close()
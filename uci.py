@@ -0,0 +1,302 @@
+import math
+import os
+import sys
+import threading
+import chess
+from minmax_agent import (MinMaxAgent, Algorithms, MATE_SCORE, chess_H0, get_chess_moves, is_chess_final,
+                          is_mate_score)
+
+ENGINE_NAME = "AI_Chess_Engine"
+ENGINE_AUTHOR = "Ago95Dev"
+
+DEFAULT_ALGORITHM = Algorithms.FAIL_SOFT_ALPHA_BETA
+DEFAULT_HASH_MB = 16
+MAX_HASH_MB = 4096
+
+# Tempo tenuto di riserva sull'orologio (ms) e numero di mosse su cui dividerlo se la GUI non lo indica
+MOVE_OVERHEAD_MS = 50
+DEFAULT_MOVES_TO_GO = 30
+
+# Punteggio in centipedoni riportato per le vittorie senza distanza dal matto (valori infiniti)
+INFINITE_SCORE_CP = 32000
+
+
+def format_score(value):
+    """
+    Converte un valore della ricerca nel punteggio UCI: "cp <centipedoni>" oppure "mate <mosse>"
+    (negativo se è il motore a subire il matto).
+    """
+    if value is None:
+        return "cp 0"
+    if math.isinf(value):
+        return f"cp {INFINITE_SCORE_CP if value > 0 else -INFINITE_SCORE_CP}"
+    if is_mate_score(value):
+        moves = (MATE_SCORE - abs(int(value)) + 1) // 2
+        return f"mate {moves if value > 0 else -moves}"
+    return f"cp {int(value)}"
+
+
+def allocate_time(board: chess.Board, wtime=None, btime=None, winc=0, binc=0, movestogo=None):
+    """
+    Tempo (ms) da dedicare alla mossa con i controlli di tempo di `go`: il tempo rimasto diviso
+    per le mosse mancanti al controllo, più gran parte dell'incremento, senza mai superare
+    il tempo rimasto meno un margine. Restituisce None se il tempo del giocatore al tratto non è dato.
+    """
+    remaining, increment = (wtime, winc) if board.turn == chess.WHITE else (btime, binc)
+    if remaining is None:
+        return None
+    budget = remaining / (movestogo or DEFAULT_MOVES_TO_GO) + 0.75 * (increment or 0)
+    return max(min(budget, remaining - MOVE_OVERHEAD_MS), 1)
+
+
+class UCIEngine:
+    """
+    A UCI front-end for `MinMaxAgent`. Commands are read on the calling thread, searches run on a
+    background thread with iterative deepening (`find_best_move_timed`), streaming an `info` line
+    per completed depth. `stop` sets the agent's stop event, which the search checks every few
+    nodes, so the best move is sent within milliseconds.
+
+    Options: Algorithm (any `Algorithms` value), Threads (worker processes) and Hash (MB of
+    transposition table). The agent is rebuilt when an option changes. An algorithm that cannot run
+    on several threads uses one, and one that needs the table falls back to the default algorithm
+    while Hash is 0; both cases are reported with `info string`.
+    """
+
+    def __init__(self, output=None):
+        """
+        Args:
+            output (file): Where the engine writes its replies (default: standard output).
+        """
+        self.output = output or sys.stdout
+        self._output_lock = threading.Lock()
+        self.board = chess.Board()
+        self.algorithm = DEFAULT_ALGORITHM
+        self.threads = 1
+        self.hash_mb = DEFAULT_HASH_MB
+        self.agent = None
+
+        self._stop = threading.Event()
+        # Impostato quando la ricerca può inviare bestmove (subito, o dopo stop/ponderhit in infinite e ponder)
+        self._release = threading.Event()
+        self._thread = None
+        self._timer = None
+        self._ponder_time_ms = None
+
+    def send(self, line):
+        with self._output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def _new_agent(self, algorithm, threads):
+        return MinMaxAgent(algorithm, chess_H0, None, is_chess_final, get_moves_function=get_chess_moves,
+                           tt_size_mb=self.hash_mb, workers=threads)
+
+    def _ensure_agent(self):
+        # Le opzioni restano quelle scelte dalla GUI: se la combinazione non è valida l'agente usa
+        # un solo thread e, se l'algoritmo richiede la tabella hash, l'algoritmo di default
+        if self.agent is not None:
+            return self.agent
+        try:
+            self.agent = self._new_agent(self.algorithm, self.threads)
+        except ValueError as error:
+            try:
+                self.agent = self._new_agent(self.algorithm, 1)
+                self.send(f"info string {error} Using {self.algorithm.value} with 1 thread.")
+            except ValueError as error:
+                self.agent = self._new_agent(DEFAULT_ALGORITHM, self.threads)
+                self.send(f"info string {error} Using {DEFAULT_ALGORITHM.value} with Hash {self.hash_mb}.")
+        self.agent.stop_event = self._stop
+        return self.agent
+
+    def _close_agent(self):
+        if self.agent is not None:
+            self.agent.close()
+            self.agent = None
+
+    def handle(self, line):
+        """
+        Executes a command line. Returns False when the engine must quit.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            algorithms = " ".join(f"var {algorithm.value}" for algorithm in Algorithms)
+            self.send(f"option name Algorithm type combo default {DEFAULT_ALGORITHM.value} {algorithms}")
+            self.send(f"option name Threads type spin default 1 min 1 max {os.cpu_count() or 1}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 0 max {MAX_HASH_MB}")
+            self.send("option name Ponder type check default false")
+            self.send("uciok")
+        elif command == "isready":
+            self._ensure_agent()
+            self.send("readyok")
+        elif command == "setoption":
+            self._stop_search()
+            self._set_option(args)
+        elif command == "ucinewgame":
+            self._stop_search()
+            self._close_agent()
+            self.board = chess.Board()
+        elif command == "position":
+            self._stop_search()
+            self._set_position(args)
+        elif command == "go":
+            self._stop_search()
+            self._go(args)
+        elif command == "stop":
+            self._stop_search()
+        elif command == "ponderhit":
+            self._ponderhit()
+        elif command == "quit":
+            self._stop_search()
+            self._close_agent()
+            return False
+        return True
+
+    def _set_option(self, args):
+        # setoption name <nome> [value <valore>]; il nome può contenere spazi
+        if "name" not in args:
+            return
+        rest = args[args.index("name") + 1:]
+        if "value" in rest:
+            name, value = " ".join(rest[:rest.index("value")]), " ".join(rest[rest.index("value") + 1:])
+        else:
+            name, value = " ".join(rest), None
+        name = name.lower()
+        try:
+            if name == "algorithm":
+                self.algorithm = Algorithms(value)
+            elif name == "threads":
+                self.threads = max(int(value), 1)
+            elif name == "hash":
+                self.hash_mb = min(max(int(value), 0), MAX_HASH_MB)
+            else:
+                return
+        except (TypeError, ValueError):
+            self.send(f"info string Invalid value for option {name}: {value}")
+            return
+        self._close_agent()
+
+    def _set_position(self, args):
+        # position [startpos | fen <fen>] [moves <mossa> ...]
+        moves = args.index("moves") if "moves" in args else len(args)
+        try:
+            if args and args[0] == "fen":
+                board = chess.Board(" ".join(args[1:moves]))
+            else:
+                board = chess.Board()
+            for uci in args[moves + 1:]:
+                board.push_uci(uci)
+        except ValueError as error:
+            self.send(f"info string Invalid position: {error}")
+            return
+        self.board = board
+
+    def _go(self, args):
+        options = {}
+        flags = set()
+        i = 0
+        while i < len(args):
+            if args[i] in ("infinite", "ponder"):
+                flags.add(args[i])
+                i += 1
+            elif args[i] == "searchmoves":
+                # Le mosse da cercare non sono supportate: vengono ignorate
+                i += 1
+                while i < len(args) and args[i] not in ("depth", "nodes", "movetime", "wtime", "btime", "winc",
+                                                       "binc", "movestogo", "infinite", "ponder", "mate"):
+                    i += 1
+            else:
+                try:
+                    options[args[i]] = int(args[i + 1])
+                except (IndexError, ValueError):
+                    pass
+                i += 2
+
+        if "movetime" in options:
+            time_ms = options["movetime"]
+        else:
+            time_ms = allocate_time(self.board, options.get("wtime"), options.get("btime"), options.get("winc", 0),
+                                    options.get("binc", 0), options.get("movestogo"))
+        pondering = "ponder" in flags
+
+        self._stop.clear()
+        self._release.clear()
+        if not ("infinite" in flags or pondering):
+            self._release.set()
+        self._ponder_time_ms = time_ms if pondering else None
+        agent = self._ensure_agent()
+        # Senza limiti di tempo la ricerca termina alla profondità richiesta o con stop
+        search_time = math.inf if time_ms is None or "infinite" in flags or pondering else time_ms
+        self._thread = threading.Thread(
+            target=self._search, args=(agent, self.board.copy(), search_time, options.get("depth", 64),
+                                       options.get("nodes")), daemon=True)
+        self._thread.start()
+
+    def _search(self, agent, board, time_ms, max_depth, max_nodes):
+        result = agent.find_best_move_timed(board, time_ms, max_nodes, max_depth, on_iteration=self._info)
+        # In infinite e ponder bestmove si invia solo dopo stop (o ponderhit)
+        self._release.wait()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        # La PV inizia con la mossa migliore; è vuota se la ricerca è stata fermata prima di completare
+        # la prima iterazione o se la partita è finita
+        if result.pv:
+            best_move = result.pv[0]
+        else:
+            best_move = next(iter(board.legal_moves), None)
+        if best_move is None:
+            self.send("bestmove 0000")
+        elif len(result.pv) > 1:
+            self.send(f"bestmove {best_move.uci()} ponder {result.pv[1].uci()}")
+        else:
+            self.send(f"bestmove {best_move.uci()}")
+
+    def _info(self, result):
+        time_ms = int(result.time * 1000)
+        pv = " ".join(move.uci() for move in result.pv)
+        self.send(f"info depth {result.depth} seldepth {result.seldepth} score {format_score(result.score)} "
+                  f"nodes {result.nodes} nps {result.nps} time {time_ms}" + (f" pv {pv}" if pv else ""))
+
+    def _ponderhit(self):
+        # La mossa attesa è stata giocata: la ricerca continua con il tempo calcolato per il `go ponder`
+        # (senza controlli di tempo prosegue come con infinite, fino a stop)
+        if self._thread is None or self._ponder_time_ms is None:
+            return
+        self._timer = threading.Timer(self._ponder_time_ms / 1000, self._stop.set)
+        self._timer.daemon = True
+        self._timer.start()
+        self._ponder_time_ms = None
+        self._release.set()
+
+    def _stop_search(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._release.set()
+        self._thread.join()
+        self._thread = None
+
+
+def main():
+    """
+    Ciclo principale del motore UCI: legge i comandi dallo standard input fino a `quit`.
+    """
+    engine = UCIEngine()
+    # I comandi si leggono da un file distinto da sys.stdin: i worker creati con fork chiudono sys.stdin
+    # all'avvio e resterebbero bloccati sul suo lock, tenuto da questo thread mentre attende un comando
+    with open(sys.stdin.fileno(), closefd=False) as commands:
+        for line in commands:
+            if not engine.handle(line):
+                break
+        else:
+            engine.handle("quit")
+
+
+if __name__ == "__main__":
+    main()